@@ -58,6 +58,11 @@ class AutomatizacionTab:
         """Obtiene el estado del bot."""
         return self.controller.bot_running
 
+    @property
+    def bot_stopped_event(self):
+        """Evento señalado cuando el hilo del bot termina."""
+        return self.controller.bot_stopped_event
+
     @property
     def stopping_bot(self):
         """Obtiene si el bot se está deteniendo."""
@@ -11,7 +11,6 @@ from tkinter import ttk
 import threading
 from datetime import datetime
 from theme_manager import ModernTheme, create_modern_text_widget
-from email_config_modals import EmailConfigModal, RecipientsConfigModal, SearchConfigModal, XmlConfigModal, CombustibleExclusionsModal
 
 
 class AutomatizacionUI:
@@ -187,6 +186,7 @@ class AutomatizacionUI:
     def _handle_email_config_click(self):
         """Maneja clic en configuración de email."""
         try:
+            from email_config_modals import EmailConfigModal
             EmailConfigModal(self.parent)
         except Exception as e:
             print(f"Error abriendo modal de email: {e}")
@@ -195,6 +195,7 @@ class AutomatizacionUI:
     def _handle_recipients_config_click(self):
         """Maneja clic en configuración de destinatarios."""
         try:
+            from email_config_modals import RecipientsConfigModal
             RecipientsConfigModal(self.parent)
         except Exception as e:
             print(f"Error abriendo modal de destinatarios: {e}")
@@ -203,6 +204,7 @@ class AutomatizacionUI:
     def _handle_search_config_click(self):
         """Maneja clic en configuración de búsqueda."""
         try:
+            from email_config_modals import SearchConfigModal
             SearchConfigModal(self.parent)
         except Exception as e:
             print(f"Error abriendo modal de búsqueda: {e}")
@@ -211,6 +213,7 @@ class AutomatizacionUI:
     def _handle_xml_config_click(self):
         """Maneja clic en configuración XML."""
         try:
+            from email_config_modals import XmlConfigModal
             XmlConfigModal(self.parent)
         except Exception as e:
             print(f"Error abriendo modal XML: {e}")
@@ -219,6 +222,7 @@ class AutomatizacionUI:
     def _handle_combustible_config_click(self):
         """Maneja clic en exclusiones de combustible."""
         try:
+            from email_config_modals import CombustibleExclusionsModal
             CombustibleExclusionsModal(self.parent)
         except Exception as e:
             print(f"Error abriendo modal de combustible: {e}")
@@ -32,6 +32,10 @@ class BotController:
         self.email_processor = None
         self.stop_event = threading.Event()
 
+        # Señalado cuando el hilo del bot termina (inicialmente no hay hilo)
+        self.bot_stopped_event = threading.Event()
+        self.bot_stopped_event.set()
+
         # Flags para controlar estados críticos
         self.stopping_bot = False
         self.starting_bot = False
@@ -108,6 +112,7 @@ class BotController:
 
             # Limpiar evento de parada anterior y resetear estados
             self.stop_event.clear()
+            self.bot_stopped_event.clear()
             self.stopping_bot = False
 
             self._log_debug("Configuración verificada, creando EmailProcessor")
@@ -221,6 +226,8 @@ class BotController:
             # Notificar a la UI del error desde el hilo principal
             self.parent.after(0, lambda: self.ui.add_log_message(f"❌ Error en hilo del bot: {str(e)}", "error"))
             self.parent.after(0, self._handle_bot_thread_error)
+        finally:
+            self.bot_stopped_event.set()
 
     def _handle_bot_thread_error(self):
         """Maneja errores del thread del bot en el hilo principal."""
@@ -298,6 +305,7 @@ class BotController:
                 pass
         self.email_processor = None
         self.bot_thread = None
+        self.bot_stopped_event.set()
 
     def _reset_stop_state(self):
         """Resetea el estado de parada en caso de error."""
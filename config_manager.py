@@ -9,6 +9,7 @@ import json
 import os
 import base64
 import re
+import stat
 import threading
 from datetime import datetime
 
@@ -140,8 +141,13 @@ Sistema: Búsqueda optimizada correos "Cargador" con archivos Excel"""
             # Construir ruta dinámica
             dynamic_path = self.build_dynamic_xml_path(base_path)
 
-            # Verificar si existe
-            if os.path.exists(dynamic_path) and os.path.isdir(dynamic_path):
+            # Verificar si existe y es carpeta con un solo stat (en vez de exists() + isdir())
+            try:
+                is_folder = stat.S_ISDIR(os.stat(dynamic_path).st_mode)
+            except OSError:
+                is_folder = False
+
+            if is_folder:
                 return True, dynamic_path, f"Carpeta del mes actual encontrada"
             else:
                 current_date = datetime.now()
@@ -458,6 +464,13 @@ Sistema: Búsqueda optimizada correos "Cargador" con archivos Excel"""
         except (ValueError, TypeError):
             return False, "Límite de revisión manual debe ser un número entero"
 
+        if 'max_parallel_xml' in xml_config:
+            try:
+                if not 1 <= int(xml_config['max_parallel_xml']) <= 32:
+                    return False, "Lectura paralela de XML debe estar entre 1 y 32"
+            except (ValueError, TypeError):
+                return False, "Lectura paralela de XML debe ser un número entero"
+
         boolean_fields = ['delete_originals', 'auto_send', 'detailed_logs']
         for field in boolean_fields:
             if field in xml_config and not isinstance(xml_config[field], bool):
@@ -16,6 +16,13 @@ from config_manager import ConfigManager
 from theme_manager import ModernTheme
 
 
+def _notify_config_saved(widget):
+    """Avisa a la ventana principal que la configuración cambió para invalidar su cache."""
+    invalidate = getattr(widget.winfo_toplevel(), 'invalidate_config_cache', None)
+    if invalidate:
+        invalidate()
+
+
 class EmailConfigModal:
     """Modal para configuración de credenciales de email."""
 
@@ -195,6 +202,7 @@ class EmailConfigModal:
 
             # Guardar
             self.config_manager.save_config(existing_config)
+            _notify_config_saved(self.parent)
 
             self.update_status("🟢 Configuración guardada", "green")
             messagebox.showinfo("Éxito", "Configuración de email guardada correctamente")
@@ -385,6 +393,7 @@ class RecipientsConfigModal:
 
             # Guardar
             self.config_manager.save_config(existing_config)
+            _notify_config_saved(self.parent)
 
             self.update_status("🟢 Configuración guardada", "green")
             messagebox.showinfo("Éxito", "Configuración de destinatarios guardada correctamente")
@@ -625,6 +634,7 @@ class SearchConfigModal:
 
             # Guardar
             self.config_manager.save_config(existing_config)
+            _notify_config_saved(self.parent)
 
             self.update_status("🟢 Configuración guardada", "green")
             messagebox.showinfo("Éxito", "Configuración de búsqueda guardada correctamente")
@@ -940,6 +950,7 @@ class XmlConfigModal:
 
             # Guardar
             self.config_manager.save_config(existing_config)
+            _notify_config_saved(self.parent)
 
             configured_count = len(company_folders)
             self.update_status(f"🟢 Guardado: {configured_count} carpetas configuradas", "green")
@@ -1191,6 +1202,7 @@ class CombustibleExclusionsModal:
 
             # Guardar
             self.config_manager.save_config(config)
+            _notify_config_saved(self.parent)
             self.update_status("🟢 Exclusiones guardadas correctamente", "green")
             messagebox.showinfo("Éxito", "Exclusiones guardadas correctamente")
 
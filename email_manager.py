@@ -34,6 +34,9 @@ class EmailManager:
         # Cache para evitar procesar el mismo email múltiples veces
         self.processed_emails_cache = set()
 
+        # IDs procesados pendientes de marcar como leídos (un solo STORE por lote)
+        self._pending_seen = []
+
     def get_provider_config(self, provider):
         """Obtiene la configuración del proveedor."""
         imap, smtp = self.providers_config.get(provider, ("", ""))
@@ -89,6 +92,10 @@ class EmailManager:
             if self.is_connected:
                 self.disconnect()
 
+            # Los pendientes son números de secuencia IMAP, válidos solo en la sesión que los
+            # obtuvo: en una sesión nueva apuntarían a otros mensajes
+            self._pending_seen.clear()
+
             config = self.get_provider_config(provider)
             socket.setdefaulttimeout(self.connection_timeout)
 
@@ -118,6 +125,8 @@ class EmailManager:
     def disconnect(self):
         """Desconecta del servidor."""
         if self.connection and self.is_connected:
+            # No perder las marcas de leído pendientes al cerrar
+            self.flush_seen()
             try:
                 socket.setdefaulttimeout(10)
                 self.connection.close()
@@ -127,6 +136,8 @@ class EmailManager:
             finally:
                 self.connection = None
                 self.is_connected = False
+                # Si el flush falló, los números de secuencia no sirven para la próxima sesión
+                self._pending_seen.clear()
                 socket.setdefaulttimeout(None)
 
     def search_cargador_emails_with_excel(self):
@@ -141,6 +152,9 @@ class EmailManager:
             print("Error: No hay conexión IMAP activa")
             return []
 
+        # Marcar como leídos los correos del lote anterior antes de buscar
+        self.flush_seen()
+
         try:
             socket.setdefaulttimeout(self.operation_timeout)
 
@@ -321,46 +335,76 @@ class EmailManager:
 
         return downloaded_files
 
-    def mark_email_as_read_and_cache(self, message_id):
+    def mark_email_processed(self, message_id):
         """
-        Marca un email como leído Y lo agrega al cache para evitar reprocesamiento.
+        Registra un email como procesado: lo agrega al cache y lo deja pendiente
+        de marcar como leído en el próximo flush_seen().
 
         Args:
-            message_id: ID del mensaje a marcar
+            message_id: ID del mensaje procesado
 
         Returns:
-            bool: True si se marcó exitosamente
+            bool: True si se registró exitosamente
         """
         if not self.is_connected or not self.connection:
             return False
 
-        try:
-            socket.setdefaulttimeout(30)
+        msg_id_str = message_id.decode() if isinstance(message_id, bytes) else str(message_id)
+        self._pending_seen.append(msg_id_str)
 
-            # Marcar como leído
-            self.connection.store(message_id, '+FLAGS', '\\Seen')
+        # Agregar al cache para evitar reprocesamiento
+        self.processed_emails_cache.add(msg_id_str)
 
-            # Agregar al cache para evitar reprocesamiento
-            msg_id_str = message_id.decode() if isinstance(message_id, bytes) else str(message_id)
-            self.processed_emails_cache.add(msg_id_str)
+        # Limpiar cache si se hace muy grande (mantener últimos 100)
+        if len(self.processed_emails_cache) > 100:
+            # Convertir a lista, tomar los últimos 100, convertir de vuelta a set
+            cache_list = list(self.processed_emails_cache)
+            self.processed_emails_cache = set(cache_list[-100:])
+            print("🧹 Cache de emails limpiado (mantenidos últimos 100)")
 
-            print(f"✅ Email marcado como leído y cacheado: {msg_id_str}")
+        return True
 
-            # Limpiar cache si se hace muy grande (mantener últimos 100)
-            if len(self.processed_emails_cache) > 100:
-                # Convertir a lista, tomar los últimos 100, convertir de vuelta a set
-                cache_list = list(self.processed_emails_cache)
-                self.processed_emails_cache = set(cache_list[-100:])
-                print("🧹 Cache de emails limpiado (mantenidos últimos 100)")
+    def flush_seen(self):
+        """
+        Marca como leídos todos los emails pendientes con un único comando STORE.
 
+        Returns:
+            bool: True si no había pendientes o se marcaron exitosamente
+        """
+        if not self._pending_seen:
+            return True
+
+        if not self.is_connected or not self.connection:
+            return False
+
+        message_set = ','.join(self._pending_seen)
+
+        try:
+            socket.setdefaulttimeout(30)
+            self.connection.store(message_set, '+FLAGS', '\\Seen')
+            print(f"✅ {len(self._pending_seen)} emails marcados como leídos: {message_set}")
+            self._pending_seen.clear()
             return True
 
         except Exception as e:
-            print(f"Error marking email as read: {e}")
+            print(f"Error marking emails as read: {e}")
             return False
         finally:
             socket.setdefaulttimeout(None)
 
+    def mark_email_as_read_and_cache(self, message_id):
+        """
+        Marca un email como leído Y lo agrega al cache para evitar reprocesamiento.
+        Para lotes usar mark_email_processed() + flush_seen().
+
+        Args:
+            message_id: ID del mensaje a marcar
+
+        Returns:
+            bool: True si se marcó exitosamente
+        """
+        return self.mark_email_processed(message_id) and self.flush_seen()
+
     def clear_processed_cache(self):
         """Limpia el cache de emails procesados."""
         self.processed_emails_cache.clear()
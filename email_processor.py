@@ -324,6 +324,10 @@ class EmailProcessor:
                     self.log_message(f"❌ Error procesando email: {str(e)}", "error")
                     self.session_stats['errors'] += 1
 
+            # Marcar todo el lote como leído con un solo STORE
+            if not self.email_manager.flush_seen():
+                self.log_message("⚠️ No se pudieron marcar los correos como leídos", "warning")
+
             if not downloaded_files:
                 self.log_message("📭 No se descargaron archivos", "info")
                 return True
@@ -366,7 +370,7 @@ class EmailProcessor:
 
         if not email_details['has_excel']:
             # Marcar como leído aunque no tenga Excel
-            self.email_manager.mark_email_as_read_and_cache(email_id)
+            self.email_manager.mark_email_processed(email_id)
             return None
 
         # Descargar archivos Excel
@@ -378,9 +382,9 @@ class EmailProcessor:
             for file_info in downloaded_files:
                 self.log_message(f"💾 Descargado: {file_info['filename']}", "success")
 
-            # IMPORTANTE: Marcar como leído Y cachear DESPUÉS del procesamiento exitoso
-            if self.email_manager.mark_email_as_read_and_cache(email_id):
-                self.log_message("✅ Email procesado y marcado como leído", "success")
+            # IMPORTANTE: Cachear DESPUÉS del procesamiento exitoso (leído al final del lote)
+            if self.email_manager.mark_email_processed(email_id):
+                self.log_message("✅ Email procesado, pendiente de marcar como leído", "success")
 
             return downloaded_files
 
@@ -9,17 +9,34 @@ configuradas, campo Paquete y procesamiento especial para facturas de Correos de
 """
 
 import os
-import glob
-import xml.etree.ElementTree as ET
+import re
 import threading
 import time
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+
+# lxml (libxml2 en C) es opcional: si está instalado se usa para parsear los XML de facturas,
+# si no se usa xml.etree.ElementTree de la librería estándar (misma API: parse, iter, ParseError)
+try:
+    from lxml import etree as ET
+
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+    LXML_AVAILABLE = False
 
 try:
     from openpyxl import load_workbook, Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
 
     OPENPYXL_AVAILABLE = True
 except ImportError:
@@ -43,13 +60,141 @@ except ImportError:
     OTRO_TEXTO_PROCESSOR_AVAILABLE = False
     print("Advertencia: otro_texto_processor no está disponible. Funcionalidad de extracción de placas limitada.")
 
+# Hilos para recorrer los XML de una empresa (lectura de disco y parseo se solapan). Es el valor
+# por defecto de 'max_parallel_xml' en la configuración: en discos lentos o de red conviene bajarlo
+XML_SCAN_MAX_WORKERS = min(8, os.cpu_count() or 4)
+
+# Desde esta cantidad de XML por empresa el recorrido se hace en procesos en lugar de hilos: el
+# bucle de eventos de iterparse corre en Python y retiene el GIL, y con lotes grandes el costo de
+# arrancar los procesos queda amortizado. Cada tarea del pool recibe lotes de XML_PROCESS_CHUNKSIZE
+XML_PROCESS_POOL_MIN_FILES = 1000
+XML_PROCESS_CHUNKSIZE = 32
+
+# Separadores de ruta de la plataforma ('\\' y '/' en Windows)
+_PATH_SEPARATORS = tuple(sep for sep in (os.sep, os.altsep) if sep)
+
+# Patrones de fecha: descartan texto que no tiene forma de fecha sin pasar por una excepción y
+# entregan año/mes/día ya separados (no se usa strptime ni su interpretación del formato)
+_ISO_DATE_RE = re.compile(r'(?P<y>\d{4})-(?P<mo>\d{1,2})-(?P<d>\d{1,2})')
+_DMY_DATE_RE = re.compile(r'(?P<d>\d{2})(?P<sep>[-/])(?P<mo>\d{2})(?P=sep)(?P<y>\d{4})')
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_date(fecha_part: str) -> Optional[datetime]:
+    """
+    Parsea (memoizado por texto) una fecha 'yyyy-mm-dd'. Muchos XML de un mismo lote comparten
+    la fecha de emisión, así que cada fecha distinta se parsea una sola vez.
+    """
+    match = _ISO_DATE_RE.fullmatch(fecha_part)
+    if not match:
+        return None
+    try:
+        return datetime(int(match['y']), int(match['mo']), int(match['d']))
+    except ValueError:
+        # Forma válida pero fecha inexistente (p. ej. 2025-02-30)
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_dmy_date(fecha_str: str) -> Optional[datetime]:
+    """Parsea (memoizado por texto) una fecha del Excel en formato dd-mm-yyyy o dd/mm/yyyy."""
+    # Formato esperado: dd-mm-yyyy (27-06-2024); alternativo: dd/mm/yyyy
+    match = _DMY_DATE_RE.fullmatch(fecha_str)
+    if not match:
+        return None
+    try:
+        return datetime(int(match['y']), int(match['mo']), int(match['d']))
+    except ValueError:
+        # Forma válida pero fecha inexistente (p. ej. 31-02-2024)
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _format_date(fecha: datetime, date_format: str) -> str:
+    """strftime memoizado: los registros excluidos por fecha repiten pocos días distintos."""
+    return fecha.strftime(date_format)
+
+
+@dataclass
+class ParsedXml:
+    """Campos de un XML de factura obtenidos en un solo recorrido (ver ExcelProcessor._scan_xml_file)."""
+    numero: Optional[str]
+    fecha_emision: Optional[str]
+    emisor_name: Optional[str]
+    otro_texto: Optional[str]
+    detalles: List[str]
+    is_correos: bool
+
+
+# Vocales acentuadas, ñ y ç del español -> ASCII (lo mismo que deja NFKD al quitar los diacríticos)
+_ACCENT_TABLE = str.maketrans(
+    'áéíóúàèìòùâêîôûäëïöüñçÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÄËÏÖÜÑÇ',
+    'aeiouaeiouaeiouaeiouncAEIOUAEIOUAEIOUAEIOUNC'
+)
+
+
+@lru_cache(maxsize=2048)
+def _normalize_emisor_name_cached(name: str) -> str:
+    """
+    Normaliza (memoizado por texto) un nombre de emisor: sin acentos, sin espacios externos y en
+    minúsculas. Los mismos emisores se repiten en miles de XML.
+    """
+    normalized = name.translate(_ACCENT_TABLE)
+    if not normalized.isascii():
+        # Caracteres fuera de la tabla: descomposición NFKD completa
+        normalized = unicodedata.normalize('NFKD', name)
+        normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
+    return normalized.strip().lower()
+
+
+def _scan_xml_worker(xml_file_path: str, iterparse_options: Dict) -> Tuple[Optional[ParsedXml], Optional[str]]:
+    """
+    Tarea de los pools de hilos y de procesos: recorre un XML y devuelve (ParsedXml, None).
+
+    Está a nivel de módulo para poder enviarse a otro proceso. Los errores se devuelven como
+    texto en (None, mensaje): no todas las excepciones de lxml se pueden serializar, y el registro
+    en el log lo hace el hilo que consume los resultados.
+    """
+    try:
+        return ExcelProcessor._scan_xml_file(xml_file_path, iterparse_options), None
+    except Exception as e:
+        return None, str(e)
+
 
 class ExcelProcessor:
     """Clase principal para el procesamiento de archivos Excel con datos XML por empresa, rutas dinámicas, filtrado por fecha en XMLs y Excel, soporte para PDFs de Correos, y extracción de placas desde OtroTexto."""
 
+    # Etiquetas (sin namespace) que lee _scan_xml_file; el resto de elementos solo se libera.
+    # La comparación es por nombre exacto: etiquetas que solo contienen estos nombres ya no se
+    # leen (p. ej. NumeroConsecutivoReceptor, FechaEmisionDoc y DetalleMensaje de los
+    # MensajeReceptor, que por eso no entran al índice ni a xml_valid)
+    _WANTED_LOCALNAMES = frozenset({
+        'Detalle', 'NumeroConsecutivo', 'FechaEmision', 'OtroTexto',
+        'Emisor', 'Nombre', 'NombreEmisor', 'NombreComercial'
+    })
+
+    # La detección de Correos revisa toda etiqueta cuyo nombre contenga 'Nombre' (p. ej.
+    # OtrosCargos/NombreTercero). Con ElementTree llegan todas las etiquetas; con lxml el filtro
+    # 'tag' necesita los nombres, así que se agregan los Nombre* de los esquemas de Hacienda
+    _CORREOS_EXTRA_LOCALNAMES = frozenset({
+        'NombreTercero', 'NombreInstitucion', 'NombreInstitucionOtros', 'NombreReceptor'
+    })
+
+    # Nombres de display por empresa (ver _get_company_display_name)
+    _COMPANY_DISPLAY_NAMES = {
+        'nargallo': 'Nargallo del Este S.A.',
+        'ventas_fruno': 'Ventas Fruno, S.A.',
+        'creme_caramel': 'Creme Caramel',
+        'su_laka': 'Su Laka'
+    }
+
     def __init__(self, automation_tab=None):
         self.automation_tab = automation_tab
 
+        # Con interfaz, los mensajes "info" del ciclo de XML se agrupan (ver _build_xml_index_for_company)
+        self._has_logger = bool(automation_tab and hasattr(automation_tab, 'add_log_message'))
+        self._log_buffer = None
+
         if not OPENPYXL_AVAILABLE:
             self.log_message("❌ Error: openpyxl no está disponible. Instale con: pip install openpyxl", "error")
             raise ImportError("openpyxl requerido para procesamiento Excel")
@@ -82,7 +227,7 @@ class ExcelProcessor:
             'su_laka': 'SuLaka'
         }
 
-        self.combustible_exclusion_emitters = set()
+        self.combustible_exclusion_emitters = frozenset()
 
         # Columnas de Excel - Incluye "Paquete" antes de "Actividad Comercial"
         self.excel_columns = [
@@ -99,60 +244,52 @@ class ExcelProcessor:
         self.red_font = Font(color="FFFFFF", bold=True)  # Texto blanco para mejor legibilidad
         self.header_font = Font(bold=True, color="FFFFFF")
         self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        self.header_alignment = Alignment(horizontal="center", vertical="center")
+
+        self.stats = self._new_stats()
+
+        # Opciones de iterparse para lxml (sin comentarios ni instrucciones de procesamiento y sin
+        # resolver entidades, igual que ElementTree); ElementTree no acepta opciones adicionales.
+        # El filtro 'tag' se evalúa en C: Python solo recibe los eventos de las etiquetas leídas
+        # (en cualquier namespace) y de LineaDetalle, que se recibe únicamente para liberarla
+        self._iterparse_options = {}
+        if LXML_AVAILABLE:
+            self._iterparse_options = {
+                'remove_blank_text': True, 'remove_comments': True, 'remove_pis': True,
+                'resolve_entities': False,
+                'tag': tuple('{*}' + name for name in sorted(
+                    self._WANTED_LOCALNAMES | self._CORREOS_EXTRA_LOCALNAMES | {'LineaDetalle'}))
+            }
 
-        self.stats = {
-            'companies_processed': 0, 'companies_with_matches': 0, 'companies_without_matches': 0,
-            'total_xml_count': 0, 'total_xml_valid': 0, 'total_xml_current_month': 0,
-            'total_xml_excluded_by_date': 0, 'total_matches': 0,
-            'total_manual_reviews': 0, 'excel_processed': 0,
-            'files_created': 0, 'processing_time': 0, 'company_details': {},
-            'companies_no_matches': [], 'excluded_by_date_details': [],
-            # Estadísticas para Correos
-            'correos_pdfs_processed': 0, 'correos_pdfs_failed': 0, 'correos_matches': 0,
-            # Estadísticas para rutas dinámicas
-            'companies_folders_found': 0, 'companies_folders_missing': 0, 'companies_folders_skipped': [],
-            # Nuevas estadísticas para filtrado de Excel
-            'excel_rows_total': 0, 'excel_rows_current_month': 0, 'excel_rows_excluded_by_date': 0,
-            'excel_excluded_by_date_details': [],
-            # Nuevas estadísticas para extracción de placas desde OtroTexto
-            'otro_texto_processed': 0, 'placas_extracted': 0, 'placas_failed': 0,
-            'fallback_to_detalle': 0, 'placa_extraction_rate': 0.0,
-            # Estadísticas para exclusiones de combustible
-            'combustible_exclusions_applied': 0
-        }
+        # Máximo de XML leídos/parseados a la vez (configurable con 'max_parallel_xml')
+        self.max_parallel_xml = XML_SCAN_MAX_WORKERS
 
         self.stop_event = threading.Event()
         self.current_month = datetime.now().month
         self.current_year = datetime.now().year
+        self._current_ym = (self.current_month, self.current_year)
 
     def _parse_excel_date(self, fecha_documento_text: str) -> Optional[datetime]:
         """
         Parsea la fecha del documento Excel desde formato dd-mm-yyyy.
 
         Args:
-            fecha_documento_text (str): Fecha en formato '27-06-2024'
+            fecha_documento_text (str): Fecha en formato '27-06-2024' (o datetime si la celda es de fecha)
 
         Returns:
             datetime: Objeto datetime o None si no se puede parsear
         """
-        try:
-            if not fecha_documento_text:
-                return None
+        if not fecha_documento_text:
+            return None
 
-            # Convertir a string si es necesario
-            fecha_str = str(fecha_documento_text).strip()
+        # Celda con formato de fecha: openpyxl ya la entrega como datetime
+        if isinstance(fecha_documento_text, datetime):
+            return fecha_documento_text
 
-            # Formato esperado: dd-mm-yyyy (27-06-2024)
-            if len(fecha_str) == 10 and fecha_str.count('-') == 2:
-                return datetime.strptime(fecha_str, '%d-%m-%Y')
-            # Formato alternativo: dd/mm/yyyy
-            elif len(fecha_str) == 10 and fecha_str.count('/') == 2:
-                return datetime.strptime(fecha_str, '%d/%m/%Y')
-            else:
-                return None
+        # Convertir a string si es necesario
+        fecha_str = str(fecha_documento_text).strip()
 
-        except (ValueError, TypeError) as e:
-            return None
+        return _parse_dmy_date(fecha_str)
 
     def _is_excel_row_current_month(self, fecha_documento: datetime) -> bool:
         """
@@ -164,36 +301,144 @@ class ExcelProcessor:
         Returns:
             bool: True si es del mes actual
         """
-        return (fecha_documento.month == self.current_month and
-                fecha_documento.year == self.current_year)
+        return (fecha_documento.month, fecha_documento.year) == self._current_ym
 
-    def _is_correos_xml(self, xml_file_path: str) -> bool:
+    @staticmethod
+    def _scan_xml_file(xml_file_path: str, iterparse_options: Dict) -> ParsedXml:
         """
-        Verifica si un archivo XML corresponde a una factura de Correos de Costa Rica SA.
+        Recorre el XML una sola vez (iterparse) y extrae todos los campos que usa el índice.
+
+        Cada elemento se libera al cerrarse, por lo que no se mantiene el árbol completo en memoria.
 
         Args:
             xml_file_path (str): Ruta del archivo XML
+            iterparse_options (Dict): Opciones adicionales para iterparse (ver __init__)
 
         Returns:
-            bool: True si es una factura de Correos
+            ParsedXml: numero, fecha_emision, emisor_name, otro_texto, detalles e is_correos
         """
-        try:
-            tree = ET.parse(xml_file_path)
-            root = tree.getroot()
+        numero = None
+        fecha_emision = None
+        nombre_emisor = None
+        emisor_child_name = None
+        otro_texto = None
+        detalles = []
+        is_correos = False
+        in_first_emisor = False
+        emisor_seen = False
+        wanted_tags = ExcelProcessor._WANTED_LOCALNAMES
+
+        with open(xml_file_path, 'rb') as xml_source:
+            for event, elem in ET.iterparse(xml_source, events=('start', 'end'), **iterparse_options):
+                if event == 'start':
+                    # Solo interesa saber cuándo se entra al primer <Emisor>; después de cerrarlo
+                    # los eventos 'start' se descartan sin calcular el nombre de la etiqueta
+                    if not emisor_seen and elem.tag.rpartition('}')[2] == 'Emisor':
+                        in_first_emisor = True
+                    continue
 
-            # Buscar elemento Nombre que contenga exactamente "Correos de Costa Rica SA"
-            for elem in root.iter():
-                if 'Nombre' in elem.tag and elem.text:
-                    nombre_text = elem.text.strip()
-                    if nombre_text == "Correos de Costa Rica SA":
-                        self.log_message(f"📮 Detectada factura de Correos: {os.path.basename(xml_file_path)}", "info")
-                        return True
+                # Nombre local sin namespace ('{ns}Detalle' -> 'Detalle')
+                tag = elem.tag.rpartition('}')[2]
+
+                if tag in wanted_tags:
+                    text = elem.text
+
+                    # Despacho por igualdad, en orden de frecuencia (hay un Detalle por línea)
+                    if tag == 'Detalle':
+                        if text and text.strip():
+                            detalles.append(text.strip())
+                    elif tag == 'NumeroConsecutivo':
+                        if text:
+                            numero = text.strip()
+                    elif tag == 'FechaEmision':
+                        if text:
+                            fecha_emision = text.strip()
+                    elif tag == 'OtroTexto':
+                        if otro_texto is None and text:
+                            otro_texto = text.strip()
+                    elif tag == 'Emisor':
+                        if in_first_emisor:
+                            in_first_emisor = False
+                            emisor_seen = True
+                    elif text:
+                        # Nombre, NombreEmisor o NombreComercial
+                        nombre_text = text.strip()
+                        # Buscar elemento Nombre que contenga exactamente "Correos de Costa Rica SA"
+                        # (después de la primera coincidencia ya no se compara)
+                        if not is_correos and nombre_text == "Correos de Costa Rica SA":
+                            is_correos = True
+                        if nombre_text:
+                            if tag == 'NombreEmisor' and nombre_emisor is None:
+                                nombre_emisor = nombre_text
+                            if (in_first_emisor and emisor_child_name is None
+                                    and tag in ('NombreEmisor', 'Nombre')):
+                                emisor_child_name = nombre_text
+                elif not is_correos and 'Nombre' in tag:
+                    # Otras etiquetas Nombre* (NombreTercero, NombreInstitucion, ...): solo cuentan
+                    # para detectar Correos, igual que la búsqueda original por subcadena
+                    text = elem.text
+                    if text and text.strip() == "Correos de Costa Rica SA":
+                        is_correos = True
+
+                # Liberar el elemento ya procesado (y sus hermanos anteriores con lxml)
+                elem.clear()
+                if LXML_AVAILABLE:
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+
+        return ParsedXml(
+            numero=numero,
+            fecha_emision=fecha_emision,
+            # NombreEmisor en cualquier parte del XML; si no existe, el nombre dentro de <Emisor>
+            emisor_name=nombre_emisor or emisor_child_name,
+            otro_texto=otro_texto,
+            detalles=detalles,
+            is_correos=is_correos
+        )
+
+    def _iter_scan_results(self, xml_paths: List[str]) -> Iterator[Optional[Tuple[Optional[ParsedXml], Optional[str]]]]:
+        """
+        Genera, en el orden de xml_paths, el resultado de recorrer cada XML: (ParsedXml, error).
 
-            return False
+        Con muchos archivos usa un pool de procesos; si el pool no se puede crear o se rompe
+        (proceso terminado, fallo al iniciar en el ejecutable empaquetado, límites del sistema),
+        los archivos restantes se recorren con el pool de hilos. Con hilos, genera None para
+        los XML que estaban en cola cuando se solicitó la parada.
+        """
+        done = 0
 
-        except Exception as e:
-            self.log_message(f"⚠️ Error verificando XML de Correos {xml_file_path}: {e}", "warning")
-            return False
+        if len(xml_paths) >= XML_PROCESS_POOL_MIN_FILES:
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.max_parallel_xml)
+            except OSError as e:
+                self.log_message(f"⚠️ No se pudo crear el pool de procesos ({e}); se usan hilos", "warning")
+                executor = None
+
+            if executor is not None:
+                try:
+                    for result in executor.map(_scan_xml_worker, xml_paths, repeat(self._iterparse_options),
+                                               chunksize=XML_PROCESS_CHUNKSIZE):
+                        yield result
+                        done += 1
+                    return
+                except (BrokenProcessPool, OSError) as e:
+                    self.log_message(
+                        f"⚠️ Falló el pool de procesos ({str(e)[:50]}); se continúa con hilos desde el XML {done + 1}",
+                        "warning")
+                finally:
+                    executor.shutdown(cancel_futures=True)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel_xml)
+        try:
+            yield from executor.map(self._scan_xml_file_unless_stopped, xml_paths[done:])
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _scan_xml_file_unless_stopped(self, xml_file_path: str) -> Optional[Tuple[Optional[ParsedXml], Optional[str]]]:
+        """Tarea del pool de hilos: recorre el XML salvo que se haya solicitado la parada."""
+        if self.stop_event.is_set():
+            return None
+        return _scan_xml_worker(xml_file_path, self._iterparse_options)
 
     def _process_correos_xml(self, xml_file_path: str, numero_consecutivo: str) -> Tuple[bool, Optional[str]]:
         """
@@ -231,16 +476,15 @@ class ExcelProcessor:
             self.log_message(f"❌ Error procesando XML de Correos {numero_consecutivo}: {e}", "error")
             return False, None
 
-    def _apply_combustible_exclusion_if_needed(self, root, numero: str, xml_data: Dict[str, List[str]],
+    def _apply_combustible_exclusion_if_needed(self, parsed_xml: ParsedXml, xml_data: Dict[str, List[str]],
                                                company_stats: Dict) -> bool:
         """Aplica la exclusión de combustible si el emisor está configurado."""
-        should_skip, emisor_name = self._should_skip_combustible_extraction(root)
+        should_skip, emisor_name = self._should_skip_combustible_extraction(parsed_xml.emisor_name)
 
         if not should_skip:
             return False
 
-        detalles = self._extract_detalle_list(root)
-        xml_data[numero] = detalles
+        xml_data[parsed_xml.numero] = parsed_xml.detalles
         company_stats['combustible_exclusions'] += 1
         self.stats['combustible_exclusions_applied'] += 1
 
@@ -251,23 +495,11 @@ class ExcelProcessor:
 
         return True
 
-    def _extract_detalle_list(self, root) -> List[str]:
-        """Obtiene la lista de detalles desde el XML."""
-        try:
-            return [
-                elem.text.strip()
-                for elem in root.iter()
-                if 'Detalle' in elem.tag and elem.text and elem.text.strip()
-            ]
-        except Exception:
-            return []
-
-    def _should_skip_combustible_extraction(self, root) -> Tuple[bool, Optional[str]]:
+    def _should_skip_combustible_extraction(self, emisor_name: Optional[str]) -> Tuple[bool, Optional[str]]:
         """Determina si se debe omitir la extracción de placa por exclusión configurada."""
         if not self.combustible_exclusion_emitters:
             return False, None
 
-        emisor_name = self._extract_emisor_name(root)
         if not emisor_name:
             return False, None
 
@@ -277,49 +509,18 @@ class ExcelProcessor:
 
         return False, emisor_name
 
-    def _extract_emisor_name(self, root) -> Optional[str]:
-        """Extrae el NombreEmisor desde el XML."""
-        try:
-            for elem in root.iter():
-                tag = self._strip_namespace(elem.tag)
-                if tag == 'NombreEmisor' and elem.text and elem.text.strip():
-                    return elem.text.strip()
-
-            for elem in root.iter():
-                tag = self._strip_namespace(elem.tag)
-                if tag == 'Emisor':
-                    for child in elem.iter():
-                        child_tag = self._strip_namespace(child.tag)
-                        if child_tag in ('NombreEmisor', 'Nombre') and child.text and child.text.strip():
-                            return child.text.strip()
-                    break
-        except Exception:
-            return None
-
-        return None
-
-    @staticmethod
-    def _strip_namespace(tag: str) -> str:
-        if not tag:
-            return ''
-        if '}' in tag:
-            return tag.split('}', 1)[1]
-        return tag
-
     @staticmethod
     def _normalize_emisor_name(name: str) -> str:
         if not name:
             return ''
-        normalized = unicodedata.normalize('NFKD', name)
-        normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
-        return normalized.strip().lower()
+        return _normalize_emisor_name_cached(name)
 
-    def _extract_otro_texto_info(self, root) -> Optional[str]:
+    def _extract_otro_texto_info(self, parsed_xml: ParsedXml) -> Optional[str]:
         """
-        Extrae información del campo <OtroTexto> y procesa códigos de placas.
+        Procesa el contenido del campo <OtroTexto> para extraer códigos de placas.
 
         Args:
-            root: Elemento raíz del XML
+            parsed_xml (ParsedXml): XML ya recorrido (otro_texto es el primer <OtroTexto> o None)
 
         Returns:
             str: Información procesada del OtroTexto o None si no se encuentra
@@ -328,12 +529,7 @@ class ExcelProcessor:
             if not self.otro_texto_processor:
                 return None
 
-            # Buscar el campo OtroTexto
-            otro_texto_content = None
-            for elem in root.iter():
-                if 'OtroTexto' in elem.tag and elem.text:
-                    otro_texto_content = elem.text.strip()
-                    break
+            otro_texto_content = parsed_xml.otro_texto
 
             if not otro_texto_content:
                 return None
@@ -366,7 +562,7 @@ class ExcelProcessor:
 
         try:
             self._reset_stats()
-            self.combustible_exclusion_emitters = set()
+            self.combustible_exclusion_emitters = frozenset()
 
             if not config or 'company_folders' not in config:
                 return {'success': False, 'error': 'Configuración de empresas no encontrada'}
@@ -375,6 +571,11 @@ class ExcelProcessor:
             if not company_folders:
                 return {'success': False, 'error': 'No hay carpetas empresariales configuradas'}
 
+            try:
+                self.max_parallel_xml = max(1, int(config.get('max_parallel_xml', XML_SCAN_MAX_WORKERS)))
+            except (ValueError, TypeError):
+                self.max_parallel_xml = XML_SCAN_MAX_WORKERS
+
             combustible_config = config.get('combustible_exclusions', {})
             emitter_names = []
             if isinstance(combustible_config, dict):
@@ -382,11 +583,11 @@ class ExcelProcessor:
             elif isinstance(combustible_config, list):
                 emitter_names = combustible_config
 
-            self.combustible_exclusion_emitters = {
+            self.combustible_exclusion_emitters = frozenset(
                 self._normalize_emisor_name(name)
                 for name in emitter_names
                 if isinstance(name, str) and name.strip()
-            }
+            )
 
             if self.combustible_exclusion_emitters:
                 self.log_message(
@@ -464,15 +665,36 @@ class ExcelProcessor:
         self.stop_event.set()
         self.log_message("⏹️ Señal de parada enviada al procesador", "warning")
 
+    @staticmethod
+    def _new_stats() -> Dict:
+        """Crea el diccionario de estadísticas en cero (listas y diccionarios nuevos en cada llamada)."""
+        return {
+            'companies_processed': 0, 'companies_with_matches': 0, 'companies_without_matches': 0,
+            'total_xml_count': 0, 'total_xml_valid': 0, 'total_xml_current_month': 0,
+            'total_xml_excluded_by_date': 0, 'total_matches': 0,
+            'total_manual_reviews': 0, 'excel_processed': 0,
+            'files_created': 0, 'processing_time': 0, 'company_details': {},
+            'companies_no_matches': [], 'excluded_by_date_details': [],
+            # Estadísticas para Correos
+            'correos_pdfs_processed': 0, 'correos_pdfs_failed': 0, 'correos_matches': 0,
+            # Estadísticas para rutas dinámicas
+            'companies_folders_found': 0, 'companies_folders_missing': 0, 'companies_folders_skipped': [],
+            # Nuevas estadísticas para filtrado de Excel
+            'excel_rows_total': 0, 'excel_rows_current_month': 0, 'excel_rows_excluded_by_date': 0,
+            'excel_excluded_by_date_details': [],
+            # Nuevas estadísticas para extracción de placas desde OtroTexto
+            'otro_texto_processed': 0, 'placas_extracted': 0, 'placas_failed': 0,
+            'fallback_to_detalle': 0, 'placa_extraction_rate': 0.0,
+            # Estadísticas para exclusiones de combustible
+            'combustible_exclusions_applied': 0
+        }
+
     def _reset_stats(self):
         """Resetea las estadísticas para un nuevo procesamiento."""
-        self.stats = {
-            k: {} if k == 'company_details' else [] if k in ['companies_no_matches', 'excluded_by_date_details',
-                                                             'companies_folders_skipped',
-                                                             'excel_excluded_by_date_details'] else 0
-            for k in self.stats}
+        self.stats = self._new_stats()
         self.current_month = datetime.now().month
         self.current_year = datetime.now().year
+        self._current_ym = (self.current_month, self.current_year)
 
     def _parse_xml_date(self, fecha_emision_text: str) -> Optional[datetime]:
         """
@@ -484,17 +706,14 @@ class ExcelProcessor:
         Returns:
             datetime: Objeto datetime o None si no se puede parsear
         """
-        try:
-            # Formato típico: 2025-07-01T10:19:14-06:00
-            # Extraer solo la parte de fecha y hora, ignorar timezone
-            if 'T' in fecha_emision_text:
-                fecha_part = fecha_emision_text.split('T')[0]
-                return datetime.strptime(fecha_part, '%Y-%m-%d')
-            else:
-                # Si solo tiene fecha
-                return datetime.strptime(fecha_emision_text[:10], '%Y-%m-%d')
-        except (ValueError, IndexError) as e:
-            return None
+        # Formato típico: 2025-07-01T10:19:14-06:00
+        # Extraer solo la parte de fecha y hora, ignorar timezone
+        if 'T' in fecha_emision_text:
+            fecha_part = fecha_emision_text.split('T')[0]
+        else:
+            # Si solo tiene fecha
+            fecha_part = fecha_emision_text[:10]
+        return _parse_iso_date(fecha_part)
 
     def _is_current_month(self, fecha_emision: datetime) -> bool:
         """
@@ -506,8 +725,7 @@ class ExcelProcessor:
         Returns:
             bool: True si es del mes actual
         """
-        return (fecha_emision.month == self.current_month and
-                fecha_emision.year == self.current_year)
+        return (fecha_emision.month, fecha_emision.year) == self._current_ym
 
     def _validate_folders(self, input_folder: str, output_folder: str, company_folders: Dict) -> bool:
         """Valida que las carpetas existan y sean accesibles (solo carpetas base para rutas dinámicas)."""
@@ -535,7 +753,15 @@ class ExcelProcessor:
     def _find_excel_files(self, input_folder: str) -> List[str]:
         """Busca archivos Excel en la carpeta de entrada."""
         try:
-            excel_files = glob.glob(os.path.join(input_folder, "cargador*.xlsx"))
+            # Una sola pasada por el directorio: DirEntry trae nombre y tipo sin stat adicional.
+            # normcase mantiene la comparación sin mayúsculas de glob en Windows
+            with os.scandir(input_folder) as entries:
+                excel_files = [
+                    entry.path for entry in entries
+                    if os.path.normcase(entry.name).startswith('cargador')
+                    and os.path.normcase(entry.name).endswith('.xlsx')
+                    and entry.is_file(follow_symlinks=False)
+                ]
 
             if excel_files:
                 self.log_message(f"📊 Encontrados {len(excel_files)} archivos Excel para procesar", "success")
@@ -650,147 +876,179 @@ class ExcelProcessor:
 
         xml_data = {}
 
-        for i, (xml_file, rel_path, depth) in enumerate(xml_files_info, 1):
-            if self.stop_event.is_set():
-                break
+        # Contadores del ciclo en variables locales; se vuelcan a las estadísticas al final
+        xml_errors = 0
+        xml_excluded_by_date = 0
+        xml_valid = 0
+
+        # Valores y métodos que no cambian durante el ciclo, leídos una sola vez
+        total_files = len(xml_files_info)
+        last_files_from = total_files - 5
+        company_name = self._get_company_display_name(company_key)
+        excluded_details = self.stats['excluded_by_date_details']
+        stop_is_set = self.stop_event.is_set
+        log = self.log_message
+        parse_date = self._parse_xml_date
+        is_current_month = self._is_current_month
+        format_date = _format_date
+        index_parsed_xml = self._index_parsed_xml
+
+        # El parseo de cada XML se reparte en hilos (lxml libera el GIL al parsear) o, con muchos
+        # archivos, en procesos; los resultados se consumen en orden en este hilo, que es el único
+        # que modifica xml_data y las estadísticas y el que atiende la solicitud de parada
+        # Con interfaz, los mensajes "info" del ciclo (uno o más por XML) se envían en bloques de
+        # 200 archivos: cada mensaje le cuesta a la interfaz una inserción y un recorte del log
+        if self._has_logger:
+            self._log_buffer = []
+
+        results = self._iter_scan_results([xml_file for xml_file, _, _ in xml_files_info])
 
-            try:
-                if i % 200 == 0 or i <= 10 or i > len(xml_files_info) - 5:
-                    progress = (i / len(xml_files_info)) * 100
-                    self.log_message(f"   [{progress:5.1f}%] {rel_path}", "info")
-
-                tree = ET.parse(xml_file)
-                root = tree.getroot()
-
-                numero = None
-                fecha_emision = None
-
-                # Extraer NumeroConsecutivo y FechaEmision
-                for elem in root.iter():
-                    if 'NumeroConsecutivo' in elem.tag and elem.text:
-                        numero = elem.text.strip()
-                    elif 'FechaEmision' in elem.tag and elem.text:
-                        fecha_emision = elem.text.strip()
-
-                if numero and fecha_emision:
-                    # FILTRADO POR FECHA - Proceso temprano crítico
-                    parsed_date = self._parse_xml_date(fecha_emision)
-
-                    if parsed_date is None:
-                        # Error parseando fecha, contar como error
-                        company_stats['xml_errors'] += 1
+        try:
+            for i, ((xml_file, rel_path, depth), result) in enumerate(zip(xml_files_info, results), 1):
+                if stop_is_set():
+                    break
+
+                if i % 200 == 0:
+                    self._flush_log_buffer()
+
+                try:
+                    if i % 200 == 0 or i <= 10 or i > last_files_from:
+                        progress = (i / total_files) * 100
+                        log(f"   [{progress:5.1f}%] {rel_path}", "info")
+
+                    # Un solo recorrido del XML (hecho por el pool) entrega todos los campos usados abajo
+                    if result is None:
+                        # Cancelado mientras el XML estaba en cola
+                        break
+                    parsed_xml, scan_error = result
+                    if scan_error is not None:
+                        raise ValueError(scan_error)
+                    numero = parsed_xml.numero
+                    fecha_emision = parsed_xml.fecha_emision
+
+                    if not numero:
                         continue
 
-                    if not self._is_current_month(parsed_date):
-                        # XML fuera del mes actual - EXCLUIR del procesamiento
-                        company_stats['xml_excluded_by_date'] += 1
-                        self.stats['total_xml_excluded_by_date'] += 1
-
-                        # Registrar para el reporte PDF
-                        self.stats['excluded_by_date_details'].append({
-                            'company': self._get_company_display_name(company_key),
-                            'numero_consecutivo': numero,
-                            'fecha_emision': fecha_emision,
-                            'fecha_parsed': parsed_date.strftime('%Y-%m-%d')
-                        })
-                        continue  # SALTAR este XML completamente
-
-                    # XML del mes actual - INCLUIR en el análisis
-                    # VERIFICAR SI ES FACTURA DE CORREOS (tiene prioridad sobre extracción de placas)
-                    is_correos = self._is_correos_xml(xml_file)
-
-                    if is_correos:
-                        # Procesar como factura de Correos usando PDF
-                        success, correos_data = self._process_correos_xml(xml_file, numero)
-                        if success and correos_data:
-                            xml_data[numero] = [correos_data]  # Usar dato del PDF
-                            company_stats['correos_processed'] += 1
-                        else:
-                            # Si falla el procesamiento de PDF, usar detalles normales como fallback
-                            detalles = [elem.text.strip() for elem in root.iter()
-                                        if 'Detalle' in elem.tag and elem.text and elem.text.strip()]
-                            xml_data[numero] = detalles
-                    else:
-                        if not self._apply_combustible_exclusion_if_needed(root, numero, xml_data, company_stats):
-                            # Intentar extraer placa desde OtroTexto
-                            placa_info = self._extract_otro_texto_info(root)
-
-                            if placa_info:
-                                # Se extrajo placa exitosamente desde OtroTexto
-                                xml_data[numero] = [placa_info]
-                                company_stats['placas_extracted'] += 1
-                            else:
-                                # No se pudo extraer placa o no hay OtroTexto - usar Detalle como fallback
-                                detalles = [elem.text.strip() for elem in root.iter()
-                                            if 'Detalle' in elem.tag and elem.text and elem.text.strip()]
-                                xml_data[numero] = detalles
-                                self.stats['fallback_to_detalle'] += 1
-
-                    company_stats['xml_valid'] += 1
-                    company_stats['xml_current_month'] += 1
-                    self.stats['total_xml_valid'] += 1
-                    self.stats['total_xml_current_month'] += 1
-
-                elif numero and not fecha_emision:
-                    # Tiene numero pero no fecha - incluir con advertencia
-                    # Verificar si es de Correos
-                    is_correos = self._is_correos_xml(xml_file)
-
-                    if is_correos:
-                        # Procesar como factura de Correos usando PDF
-                        success, correos_data = self._process_correos_xml(xml_file, numero)
-                        if success and correos_data:
-                            xml_data[numero] = [correos_data]  # Usar dato del PDF
-                            company_stats['correos_processed'] += 1
-                        else:
-                            # Fallback a detalles normales
-                            detalles = [elem.text.strip() for elem in root.iter()
-                                        if 'Detalle' in elem.tag and elem.text and elem.text.strip()]
-                            xml_data[numero] = detalles
-                    else:
-                        if not self._apply_combustible_exclusion_if_needed(root, numero, xml_data, company_stats):
-                            # Intentar extraer placa desde OtroTexto
-                            placa_info = self._extract_otro_texto_info(root)
-
-                            if placa_info:
-                                # Se extrajo placa exitosamente desde OtroTexto
-                                xml_data[numero] = [placa_info]
-                                company_stats['placas_extracted'] += 1
-                            else:
-                                # No se pudo extraer placa o no hay OtroTexto - usar Detalle como fallback
-                                detalles = [elem.text.strip() for elem in root.iter()
-                                            if 'Detalle' in elem.tag and elem.text and elem.text.strip()]
-                                xml_data[numero] = detalles
-                                self.stats['fallback_to_detalle'] += 1
-
-                    company_stats['xml_valid'] += 1
-                    company_stats['xml_current_month'] += 1
-                    self.stats['total_xml_valid'] += 1
-                    self.stats['total_xml_current_month'] += 1
-
-            except (ET.ParseError, Exception) as e:
-                company_stats['xml_errors'] += 1
-                if company_stats['xml_errors'] <= 3:
-                    self.log_message(f"⚠️ Error XML: {rel_path} - {str(e)[:50]}", "warning")
+                    if fecha_emision:
+                        # FILTRADO POR FECHA - Proceso temprano crítico
+                        parsed_date = parse_date(fecha_emision)
+
+                        if parsed_date is None:
+                            # Error parseando fecha, contar como error
+                            xml_errors += 1
+                            continue
+
+                        if not is_current_month(parsed_date):
+                            # XML fuera del mes actual - EXCLUIR del procesamiento
+                            xml_excluded_by_date += 1
+
+                            # Registrar para el reporte PDF
+                            excluded_details.append({
+                                'company': company_name,
+                                'numero_consecutivo': numero,
+                                'fecha_emision': fecha_emision,
+                                'fecha_parsed': format_date(parsed_date, '%Y-%m-%d')
+                            })
+                            continue  # SALTAR este XML completamente
+
+                    # XML del mes actual (o con numero pero sin fecha) - INCLUIR en el análisis
+                    index_parsed_xml(parsed_xml, xml_file, xml_data, company_stats)
+                    xml_valid += 1
+
+                except (ET.ParseError, Exception) as e:
+                    xml_errors += 1
+                    if xml_errors <= 3:
+                        log(f"⚠️ Error XML: {rel_path} - {str(e)[:50]}", "warning")
+        finally:
+            # Cancela los XML que sigan en cola si el ciclo terminó antes (parada o error)
+            results.close()
+            self._flush_log_buffer()
+            self._log_buffer = None
+
+        company_stats['xml_errors'] += xml_errors
+        company_stats['xml_excluded_by_date'] += xml_excluded_by_date
+        company_stats['xml_valid'] += xml_valid
+        company_stats['xml_current_month'] += xml_valid
+        self.stats['total_xml_excluded_by_date'] += xml_excluded_by_date
+        self.stats['total_xml_valid'] += xml_valid
+        self.stats['total_xml_current_month'] += xml_valid
 
         return xml_data
 
+    def _index_parsed_xml(self, parsed_xml: ParsedXml, xml_file: str, xml_data: Dict[str, List[str]],
+                          company_stats: Dict):
+        """Registra en el índice el dato de un XML ya recorrido: PDF de Correos, exclusión, placa o Detalle."""
+        numero = parsed_xml.numero
+
+        # VERIFICAR SI ES FACTURA DE CORREOS (tiene prioridad sobre extracción de placas)
+        if parsed_xml.is_correos:
+            self.log_message(f"📮 Detectada factura de Correos: {os.path.basename(xml_file)}", "info")
+
+            # Procesar como factura de Correos usando PDF
+            success, correos_data = self._process_correos_xml(xml_file, numero)
+            if success and correos_data:
+                xml_data[numero] = [correos_data]  # Usar dato del PDF
+                company_stats['correos_processed'] += 1
+            else:
+                # Si falla el procesamiento de PDF, usar detalles normales como fallback
+                xml_data[numero] = parsed_xml.detalles
+            return
+
+        if self._apply_combustible_exclusion_if_needed(parsed_xml, xml_data, company_stats):
+            return
+
+        # Intentar extraer placa desde OtroTexto
+        placa_info = self._extract_otro_texto_info(parsed_xml)
+
+        if placa_info:
+            # Se extrajo placa exitosamente desde OtroTexto
+            xml_data[numero] = [placa_info]
+            company_stats['placas_extracted'] += 1
+        else:
+            # No se pudo extraer placa o no hay OtroTexto - usar Detalle como fallback
+            xml_data[numero] = parsed_xml.detalles
+            self.stats['fallback_to_detalle'] += 1
+
     def _find_xml_files_recursive(self, root_folder: str) -> List[Tuple[str, str, int]]:
         """Encuentra todos los archivos XML de manera recursiva."""
         xml_files = []
 
+        # Recorrido con os.scandir en el mismo orden que os.walk (archivos de la carpeta y luego
+        # cada subcarpeta en profundidad). La ruta relativa y la profundidad se acumulan al bajar
+        # de nivel en lugar de calcularse con os.path.relpath por carpeta
+        root_prefix = root_folder if root_folder.endswith(_PATH_SEPARATORS) else root_folder + os.sep
+        pending = [(root_prefix, '', 0)]
+
         try:
-            for root, dirs, files in os.walk(root_folder):
+            while pending:
                 if self.stop_event.is_set():
                     break
 
-                relative_path = os.path.relpath(root, root_folder)
-                depth = 0 if relative_path == '.' else len(relative_path.split(os.sep))
+                folder_prefix, relative_prefix, depth = pending.pop()
+                subfolders = []
+
+                try:
+                    with os.scandir(folder_prefix) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            try:
+                                is_dir = entry.is_dir()
+                            except OSError:
+                                is_dir = False
+
+                            if is_dir:
+                                # Igual que os.walk: los enlaces a carpetas no se recorren
+                                if not entry.is_symlink():
+                                    subfolders.append((folder_prefix + name + os.sep,
+                                                       relative_prefix + name + os.sep, depth + 1))
+                            elif name.lower().endswith('.xml'):
+                                xml_files.append((folder_prefix + name, relative_prefix + name, depth))
+                except OSError:
+                    # Carpeta inaccesible: se omite, como hace os.walk
+                    continue
 
-                xml_files.extend([
-                    (os.path.join(root, f), os.path.relpath(os.path.join(root, f), root_folder), depth)
-                    for f in files if f.lower().endswith('.xml')
-                ])
+                # La pila saca el último elemento: se invierte para visitar las subcarpetas en orden
+                pending.extend(reversed(subfolders))
 
         except (PermissionError, Exception) as e:
             self.log_message(f"⚠️ Error explorando directorios: {str(e)[:50]}", "warning")
@@ -812,13 +1070,19 @@ class ExcelProcessor:
             if self.stop_event.is_set():
                 return results
 
-            wb = load_workbook(excel_file, read_only=True)
-            sheet = wb.active
-            excel_rows = list(sheet.iter_rows(min_row=2, values_only=True))
-            wb.close()
+            # Solo lectura de valores: sin modelo de estilos, sin fórmulas y sin vínculos externos
+            wb = load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+            try:
+                # Filtrar filas de Excel por fecha ANTES de procesarlas contra las empresas. Las filas
+                # se filtran a medida que se leen: solo se guardan en memoria las que se conservan
+                filtered_excel_rows = self._filter_excel_rows_by_date(
+                    wb.active.iter_rows(min_row=2, values_only=True), filename)
+            finally:
+                wb.close()
 
-            # Filtrar filas de Excel por fecha ANTES de procesarlas contra las empresas
-            filtered_excel_rows = self._filter_excel_rows_by_date(excel_rows, filename)
+            # Número consecutivo de cada fila (columna 2) calculado una sola vez por Excel y no una
+            # vez por empresa; se conserva el orden y las filas repetidas del Excel original
+            numbered_rows = [(str(row[1]).strip(), row) for row in filtered_excel_rows if row and row[1]]
 
             for company_key, xml_data in xml_data_by_company.items():
                 if self.stop_event.is_set():
@@ -831,7 +1095,7 @@ class ExcelProcessor:
                 company_activity = commercial_activities.get(company_key, "")
 
                 result = self._process_excel_for_company(
-                    filtered_excel_rows, xml_data, company_key, output_folder,
+                    numbered_rows, len(filtered_excel_rows), xml_data, company_key, output_folder,
                     filename, manual_review_limit, company_activity
                 )
 
@@ -852,33 +1116,42 @@ class ExcelProcessor:
             self.log_message(f"❌ Error procesando Excel {filename}: {str(e)}", "error")
             return results
 
-    def _filter_excel_rows_by_date(self, excel_rows: List, filename: str) -> List:
+    def _filter_excel_rows_by_date(self, excel_rows: Iterable, filename: str) -> List:
         """
         Filtra las filas del Excel por la fecha del documento, manteniendo solo las del mes actual.
 
         Args:
-            excel_rows (List): Lista de filas del Excel
+            excel_rows (Iterable): Filas del Excel; puede ser el iterador de la hoja, que se recorre una vez
             filename (str): Nombre del archivo para logging
 
         Returns:
             List: Filas filtradas que pertenecen al mes actual
         """
         filtered_rows = []
-        total_rows = len(excel_rows)
+        total_rows = 0
         excluded_count = 0
 
+        # Valores fijos durante todo el filtrado: se leen una vez y no por cada fila. La comparación
+        # de mes/año se hace en línea (equivale a _is_excel_row_current_month) y el parseo de la
+        # fecha ya está memoizado en _parse_dmy_date
+        fecha_index = self.fecha_documento_column_index
+        current_ym = self._current_ym
+        parse_excel_date = self._parse_excel_date
+        excluded_details = self.stats['excel_excluded_by_date_details']
+
         self.log_message(
             f"📅 Filtrando filas del Excel por fecha (mes actual: {self.current_month}/{self.current_year})", "info")
 
         for i, row in enumerate(excel_rows):
-            if not row or len(row) <= self.fecha_documento_column_index:
+            total_rows += 1
+            if not row or len(row) <= fecha_index:
                 # Fila vacía o sin suficientes columnas
                 continue
 
-            fecha_documento_value = row[self.fecha_documento_column_index]
+            fecha_documento_value = row[fecha_index]
 
             if fecha_documento_value:
-                parsed_date = self._parse_excel_date(fecha_documento_value)
+                parsed_date = parse_excel_date(fecha_documento_value)
 
                 if parsed_date is None:
                     # No se pudo parsear la fecha - incluir con advertencia
@@ -886,18 +1159,17 @@ class ExcelProcessor:
                     filtered_rows.append(row)
                     continue
 
-                if not self._is_excel_row_current_month(parsed_date):
+                if (parsed_date.month, parsed_date.year) != current_ym:
                     # Fecha fuera del mes actual - EXCLUIR
                     excluded_count += 1
-                    self.stats['excel_rows_excluded_by_date'] += 1
 
-                    # Registrar para estadísticas detalladas
+                    # Registrar para estadísticas detalladas (diccionarios: los lee pdf_generator)
                     numero_consecutivo = str(row[1]).strip() if len(row) > 1 and row[1] else "N/A"
-                    self.stats['excel_excluded_by_date_details'].append({
+                    excluded_details.append({
                         'filename': filename,
                         'numero_consecutivo': numero_consecutivo,
                         'fecha_documento': str(fecha_documento_value),
-                        'fecha_parsed': parsed_date.strftime('%d-%m-%Y')
+                        'fecha_parsed': _format_date(parsed_date, '%d-%m-%Y')
                     })
                     continue
 
@@ -909,6 +1181,7 @@ class ExcelProcessor:
                 filtered_rows.append(row)
 
         # Actualizar estadísticas globales
+        self.stats['excel_rows_excluded_by_date'] += excluded_count
         self.stats['excel_rows_total'] += total_rows
         self.stats['excel_rows_current_month'] += len(filtered_rows)
 
@@ -923,43 +1196,53 @@ class ExcelProcessor:
 
         return filtered_rows
 
-    def _process_excel_for_company(self, excel_rows: List, xml_data: Dict, company_key: str,
+    def _process_excel_for_company(self, numbered_rows: List[Tuple[str, tuple]], excel_row_count: int,
+                                   xml_data: Dict, company_key: str,
                                    output_folder: str, original_filename: str,
                                    manual_review_limit: int = 3, company_activity: str = "") -> Optional[Dict]:
-        """Procesa un Excel para una empresa específica incluyendo actividad comercial y campo Paquete."""
+        """
+        Procesa un Excel para una empresa específica incluyendo actividad comercial y campo Paquete.
+
+        numbered_rows son los pares (numero, fila) de las filas filtradas que tienen número y
+        excel_row_count la cantidad total de filas filtradas (para las estadísticas).
+        """
         try:
             if self.stop_event.is_set():
                 return None
 
-            new_wb = Workbook()
-            new_sheet = new_wb.active
-            self._setup_excel_headers(new_sheet)
-
-            row_out = 2
+            # Filas de salida (valores, resaltar Aplicación). Se escriben al final en un libro
+            # write_only, que exige definir los anchos de columna antes de la primera fila
+            output_rows = []
             matches = 0
+            # Largo máximo por columna, actualizado a medida que se arma cada fila
+            column_widths = [0] * len(self.excel_columns)
+            self._update_column_widths(column_widths, self.excel_columns)
+            update_column_widths = self._update_column_widths
             manual_reviews = 0
             company_stats = self.stats['company_details'][company_key]
+            stop_is_set = self.stop_event.is_set
 
-            for row in excel_rows:
-                if self.stop_event.is_set() or not row or not row[1]:
-                    continue
-
-                numero = str(row[1]).strip()
+            for numero, row in numbered_rows:
+                if stop_is_set():
+                    break
 
                 # Buscar el número en los datos XML (sin verificar duplicados)
-                if numero in xml_data:
-                    detalles = xml_data[numero]
+                detalles = xml_data.get(numero)
+                if detalles is not None:
 
                     if len(detalles) > manual_review_limit:
-                        self._write_excel_row_manual_review(new_sheet, row_out, row, company_activity)
+                        # Revisión manual: la celda de Aplicación se resalta en rojo
+                        values = self._build_output_row(row, "Revision Manual", company_activity)
+                        output_rows.append((values, len(row) >= 6))
                         manual_reviews += 1
                         company_stats['manual_reviews'] += 1
                         self.stats['total_manual_reviews'] += 1
                     else:
                         detalle_text = " | ".join(detalles) if detalles else ""
-                        self._write_excel_row_with_detail(new_sheet, row_out, row, detalle_text, company_activity)
+                        values = self._build_output_row(row, detalle_text, company_activity)
+                        output_rows.append((values, False))
 
-                    row_out += 1
+                    update_column_widths(column_widths, values)
                     matches += 1
 
             if matches > 0 and not self.stop_event.is_set():
@@ -971,12 +1254,19 @@ class ExcelProcessor:
                     f"{base_name}_procesado_{company_file_name}_{timestamp}.xlsx"
                 )
 
-                self._adjust_excel_column_widths(new_sheet)
+                # Libro en modo write_only: las filas se escriben en secuencia sin mantener las
+                # celdas en memoria; anchos y encabezado van antes que los datos
+                new_wb = Workbook(write_only=True)
+                new_sheet = new_wb.create_sheet()
+                self._adjust_excel_column_widths(new_sheet, column_widths)
+                self._setup_excel_headers(new_sheet)
+                for values, highlight_aplicacion in output_rows:
+                    self._write_output_row(new_sheet, values, highlight_aplicacion)
                 new_wb.save(output_file)
                 new_wb.close()
 
                 company_stats['matches'] += matches
-                company_stats['excel_rows_processed'] += len(excel_rows)
+                company_stats['excel_rows_processed'] += excel_row_count
                 self.stats['total_matches'] += matches
 
                 return {
@@ -990,7 +1280,6 @@ class ExcelProcessor:
                     'commercial_activity': company_activity
                 }
             else:
-                new_wb.close()
                 return None
 
         except Exception as e:
@@ -999,53 +1288,55 @@ class ExcelProcessor:
 
     def _get_company_display_name(self, company_key: str) -> str:
         """Obtiene el nombre de display de una empresa."""
-        return {
-            'nargallo': 'Nargallo del Este S.A.',
-            'ventas_fruno': 'Ventas Fruno, S.A.',
-            'creme_caramel': 'Creme Caramel',
-            'su_laka': 'Su Laka'
-        }.get(company_key, company_key)
+        return self._COMPANY_DISPLAY_NAMES.get(company_key, company_key)
 
     def _setup_excel_headers(self, sheet):
         """Configura los headers de Excel con estilo incluyendo Paquete y Actividad Comercial."""
-        for col, header in enumerate(self.excel_columns, 1):
-            cell = sheet.cell(row=1, column=col, value=header)
+        header = []
+        for title in self.excel_columns:
+            cell = WriteOnlyCell(sheet, value=title)
             cell.font = self.header_font
             cell.fill = self.header_fill
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = self.header_alignment
+            header.append(cell)
+        sheet.append(header)
 
-    def _write_excel_row_with_detail(self, sheet, row_num: int, row_data: tuple, detail: str, company_activity: str):
-        """Escribe una fila de Excel con el detalle del XML, campo Paquete y actividad comercial."""
-        # Procesar las primeras 17 columnas (incluyendo Paquete)
-        for col, value in enumerate(row_data[:17], 1):
-            if col == 6:  # Columna Aplicación
-                sheet.cell(row=row_num, column=col, value=detail)
-            else:
-                sheet.cell(row=row_num, column=col, value=value)
-
-        # Columna 18: Actividad Comercial (la última)
-        sheet.cell(row=row_num, column=18, value=company_activity)
-
-    def _write_excel_row_manual_review(self, sheet, row_num: int, row_data: tuple, company_activity: str):
-        """Escribe una fila de Excel marcada para revisión manual con Paquete y actividad comercial."""
+    @staticmethod
+    def _build_output_row(row_data: tuple, aplicacion: str, company_activity: str) -> list:
+        """Arma los valores de una fila de salida: 17 columnas del Excel original y la actividad comercial."""
         # Procesar las primeras 17 columnas (incluyendo Paquete)
-        for col, value in enumerate(row_data[:17], 1):
-            cell = sheet.cell(row=row_num, column=col)
-            if col == 6:  # Columna Aplicación
-                cell.value = "Revision Manual"
-                cell.font = self.red_font  # Font ya tiene color blanco
-                cell.fill = self.red_fill
-            else:
-                cell.value = value
+        values = list(row_data[:17])
+        if len(values) >= 6:  # Columna Aplicación
+            values[5] = aplicacion
+        values.extend([None] * (17 - len(values)))
 
         # Columna 18: Actividad Comercial (la última)
-        sheet.cell(row=row_num, column=18, value=company_activity)
+        values.append(company_activity)
+        return values
+
+    def _write_output_row(self, sheet, values: list, highlight_aplicacion: bool):
+        """Escribe una fila de salida; en revisión manual la celda de Aplicación va en rojo."""
+        if highlight_aplicacion:
+            # Solo la celda de Aplicación lleva estilo
+            cell = WriteOnlyCell(sheet, value=values[5])
+            cell.font = self.red_font  # Font ya tiene color blanco
+            cell.fill = self.red_fill
+            values[5] = cell
+        sheet.append(values)
 
-    def _adjust_excel_column_widths(self, sheet):
+    @staticmethod
+    def _update_column_widths(column_widths: List[int], values: list):
+        """Actualiza el largo máximo de cada columna con los valores de una fila."""
+        for index, value in enumerate(values):
+            if value:
+                length = len(str(value))
+                if length > column_widths[index]:
+                    column_widths[index] = length
+
+    def _adjust_excel_column_widths(self, sheet, column_widths: List[int]):
         """Ajusta automáticamente el ancho de las columnas incluyendo Paquete y Actividad Comercial."""
-        for column in sheet.columns:
-            max_length = max((len(str(cell.value)) for cell in column if cell.value), default=0)
-            sheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+        for index, max_length in enumerate(column_widths, 1):
+            sheet.column_dimensions[get_column_letter(index)].width = min(max_length + 2, 50)
 
     def _log_processing_summary(self):
         """Registra un resumen detallado del procesamiento con información de rutas dinámicas, filtrado por fecha en XMLs y Excel, estadísticas de Correos, y nueva funcionalidad de extracción de placas desde OtroTexto."""
@@ -1165,6 +1456,24 @@ class ExcelProcessor:
 
     def log_message(self, message: str, msg_type: str = "info"):
         """Envía un mensaje al log de la interfaz de forma segura."""
+        if self._log_buffer is not None:
+            if msg_type == "info":
+                self._log_buffer.append(message)
+                return
+            # Otros tipos salen de inmediato, después de lo acumulado (se conserva el orden)
+            self._flush_log_buffer()
+
+        self._emit_log_message(message, msg_type)
+
+    def _flush_log_buffer(self):
+        """Envía los mensajes "info" acumulados como una sola entrada del log de la interfaz."""
+        if self._log_buffer:
+            lines = self._log_buffer
+            self._log_buffer = []
+            self._emit_log_message("\n".join(lines), "info")
+
+    def _emit_log_message(self, message: str, msg_type: str):
+        """Escribe un mensaje en la interfaz o en consola."""
         try:
             if self.automation_tab and hasattr(self.automation_tab, 'add_log_message'):
                 self.automation_tab.add_log_message(message, msg_type)
@@ -1343,4 +1652,4 @@ class ExcelProcessor:
             report += f"• Fallback a Detalle utilizado: {self.stats['fallback_to_detalle']}\n"
             report += f"• Tasa de extracción: {self.stats['placa_extraction_rate']:.1f}%\n"
 
-        return report
\ No newline at end of file
+        return report
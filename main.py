@@ -5,6 +5,8 @@ Inicializa y ejecuta la ventana principal sin dependencias externas.
 """
 # Archivos relacionados: main_window.py
 
+import logging
+import multiprocessing
 import tkinter as tk
 from tkinter import messagebox
 import signal
@@ -29,9 +31,13 @@ def handle_thread_exception(args):
 
 def main():
     """Función principal simplificada que inicializa ContaFlow."""
-    print("🚀 Iniciando ContaFlow...")
+    if __debug__:
+        print("🚀 Iniciando ContaFlow...")
 
     try:
+        # Logging de módulos: solo advertencias y errores en producción
+        logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
         # Configurar manejo de señales
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
@@ -39,7 +45,8 @@ def main():
         # Configurar manejo de excepciones en threads
         threading.excepthook = handle_thread_exception
 
-        print("📱 Creando ventana principal...")
+        if __debug__:
+            print("📱 Creando ventana principal...")
 
         # Importar después de configurar para evitar problemas
         from main_window import MainWindow
@@ -47,8 +54,9 @@ def main():
         # Crear y configurar la ventana principal
         app = MainWindow()
 
-        print("✅ ContaFlow iniciado correctamente")
-        print("🎨 Usando tema nativo del sistema")
+        if __debug__:
+            print("✅ ContaFlow iniciado correctamente")
+            print("🎨 Usando tema nativo del sistema")
 
         # Iniciar el bucle principal
         app.mainloop()
@@ -91,4 +99,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necesario en el ejecutable empaquetado: los procesos que recorren los XML vuelven a
+    # iniciar este programa y deben ejecutar la tarea en lugar de abrir otra ventana
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
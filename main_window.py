@@ -4,29 +4,105 @@ Ventana principal simplificada de ContaFlow usando tkinter nativo.
 Interfaz limpia sin auto-inicio del bot.
 Diseño moderno y optimizado con theme_manager.
 """
-# Archivos relacionados: automatizacion_tab.py, theme_manager.py
+# Archivos relacionados: automatizacion_tab.py, config_manager.py, theme_manager.py
 
+import logging
+import queue
 import tkinter as tk
 from tkinter import ttk
 import sys
 import threading
-import time
+from datetime import datetime
+from config_manager import ConfigManager
 from theme_manager import ModernTheme, apply_modern_theme
 
+log = logging.getLogger("contaflow.main_window")
+
+# Recomendaciones de configuración: (clave de estado, mensaje si no está configurado)
+_REC_TABLE = (
+    ('email_configured', 'Configurar credenciales de email en pestaña Configuración'),
+    ('search_configured', 'Configurar carpeta de descarga en pestaña Configuración > Búsqueda'),
+    ('xml_configured', 'Configurar procesamiento XML para funcionalidad completa (opcional)'),
+    ('recipients_configured', 'Configurar destinatarios para envío automático (opcional)')
+)
+
+# Información estática del sistema (no cambia en tiempo de ejecución)
+_STATIC_SYSTEM_INFO = {
+    'version': '2.0',
+    'system_name': 'ContaFlow - Sistema Simplificado',
+    'system_type': 'simplified_cargador_search',
+    'ui_framework': 'tkinter_native',
+    'monitoring_method': 'Correos "Cargador" con archivos Excel',
+    'monitoring_interval': '1 minuto (fijo)',
+    'cache_system': 'Anti-duplicados habilitado',
+    'search_robustness': 'Sin dependencia de estado UNSEEN',
+    'features_removed': (
+        'Auto-inicio del bot',
+        'Configuración de intervalo variable',
+        'Búsqueda compleja por criterios',
+        'UI compleja con muchas opciones'
+    ),
+    'features_simplified': (
+        'Control básico del bot (start/stop)',
+        'Configuración mínima requerida',
+        'Búsqueda específica correos "Cargador"',
+        'Intervalo fijo optimizado'
+    )
+}
+
+
+class _LoadingTab:
+    """Marcador liviano que ocupa la pestaña mientras se importa la real en segundo plano."""
+
+    bot_running = False
+
+    def __init__(self, parent):
+        """Crea el mensaje de carga en el frame de la pestaña."""
+        self.label = tk.Label(parent,
+                              text="⏳ Cargando módulos...",
+                              font=ModernTheme.FONT_NORMAL,
+                              fg=ModernTheme.TEXT_SECONDARY)
+
+    def show(self):
+        """Muestra el mensaje de carga."""
+        self.label.pack(expand=True)
+
+    def hide(self):
+        """Oculta el mensaje de carga."""
+        self.label.pack_forget()
+
+    def get_bot_status(self):
+        """El bot no está disponible mientras se carga la pestaña."""
+        return {'running': False}
+
+    def destroy(self):
+        """Elimina el mensaje de carga."""
+        self.label.destroy()
+
 
 class MainWindow(tk.Tk):
     """Ventana principal simplificada con tkinter nativo sin auto-inicio."""
 
+    # Tamaño inicial de la ventana
+    WIDTH, HEIGHT = 1200, 800
+
     def __init__(self):
         """Inicializa la ventana principal simplificada con diseño moderno."""
         super().__init__()
-        print("🏗️ Inicializando ventana principal de ContaFlow v2.0 con diseño moderno...")
+        log.info("Inicializando ventana principal de ContaFlow v2.0")
 
         # Variables de control simplificadas
         self.tabs = {}
+        self._tab_handlers = {}  # nombre -> (show, hide) resueltos al registrar la pestaña
         self.current_tab = None
+        self._pending_tab = None
+        self._last_tabid = None
         self.status_label = None
 
+        # Cache del estado de configuración: (versión, resultado)
+        self._config_status_cache = None
+        self._config_version = 0
+
         # Aplicar tema moderno (primero para mejor rendimiento)
         apply_modern_theme(self)
 
@@ -36,51 +112,47 @@ class MainWindow(tk.Tk):
         # Crear interfaz
         self.create_interface()
 
-        # Inicializar pestañas
+        # Inicializar pestañas (la importación pesada se hace en segundo plano)
         self.initialize_tabs()
 
         # Mostrar pestaña por defecto
         self.show_tab("automatizacion")
 
+        # Vincular evento de cambio de pestaña (después de construir, sin eventos de arranque)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
         # Actualizar barra de estado
-        self.update_status("🟢 Sistema listo", "success")
+        self.update_status("Cargando módulos...", "info")
 
-        print("✅ ContaFlow v2.0 - Sistema Simplificado iniciado correctamente con diseño moderno")
+        log.info("ContaFlow v2.0 - Sistema Simplificado iniciado correctamente")
 
     def setup_window(self):
         """Configura las propiedades básicas de la ventana."""
-        try:
-            # Título y dimensiones
-            self.title("Bot ContaFlow")
-            self.geometry("1200x800")
-            self.minsize(800, 500)
+        # Título y dimensiones
+        self.title("Bot ContaFlow")
+        self.minsize(800, 500)
 
-            # Centrar ventana
-            self.center_window()
+        # Dimensiones y posición centrada en una sola llamada
+        self._center_window()
 
-            # Configurar cierre
-            self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Configurar cierre
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-            # Configurar icono (opcional)
-            try:
-                self.iconbitmap("icon.ico")
-            except:
-                pass
-
-        except Exception as e:
-            print(f"⚠️ Error configurando ventana: {e}")
+        # Configurar icono (opcional) cuando la ventana ya esté visible
+        self.after_idle(self._load_icon)
 
-    def center_window(self):
-        """Centra la ventana en la pantalla."""
+    def _load_icon(self):
+        """Carga el icono de la ventana fuera del camino crítico de arranque."""
         try:
-            self.update_idletasks()
-            width = self.winfo_width()
-            height = self.winfo_height()
-            x = (self.winfo_screenwidth() // 2) - (width // 2)
-            y = (self.winfo_screenheight() // 2) - (height // 2)
-            self.geometry(f"{width}x{height}+{x}+{y}")
-        except Exception as e:
-            print(f"⚠️ Error centrando ventana: {e}")
+            self.iconbitmap("icon.ico")
+        except tk.TclError as e:
+            log.warning("No se pudo cargar el icono: %s", e)
+
+    def _center_window(self):
+        """Centra la ventana en la pantalla con su tamaño inicial, sin forzar un layout."""
+        x = (self.winfo_screenwidth() - self.WIDTH) // 2
+        y = (self.winfo_screenheight() - self.HEIGHT) // 2
+        self.geometry(f"{self.WIDTH}x{self.HEIGHT}+{x}+{y}")
 
     def create_interface(self):
         """Crea la interfaz principal moderna con notebook de pestañas."""
@@ -103,9 +175,7 @@ class MainWindow(tk.Tk):
 
         # Agregar pestaña al notebook con estilo moderno
         self.notebook.add(self.automatizacion_frame, text="⚡ Automatización")
-
-        # Vincular evento de cambio de pestaña
-        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._tabid_to_name = {str(self.automatizacion_frame): "automatizacion"}
 
         # Barra de estado moderna
         self.create_status_bar(main_frame)
@@ -169,70 +239,150 @@ class MainWindow(tk.Tk):
         self.status_label.config(text=f"{icon} {message}")
 
     def initialize_tabs(self):
-        """Inicializa las pestañas del sistema simplificado."""
+        """
+        Inicializa las pestañas del sistema simplificado.
+
+        Muestra un marcador inmediatamente y resuelve en un hilo los imports
+        pesados (IMAP, XML, envío de correos) para no retrasar la ventana.
+        """
+        self._register_tab("automatizacion", _LoadingTab(self.automatizacion_frame))
+        self._import_results = queue.Queue(maxsize=1)
+        threading.Thread(target=self._background_import, daemon=True).start()
+        self.after(50, self._poll_background_import)
+
+    def _background_import(self):
+        """
+        Importa los módulos de las pestañas fuera del hilo de Tk.
+
+        El hilo no llama a Tk (ni siquiera after): deja el resultado en la cola y el
+        hilo principal lo recoge en _poll_background_import.
+        """
         try:
-            # Importar y crear pestaña de automatización
             from automatizacion_tab import AutomatizacionTab
-            self.tabs["automatizacion"] = AutomatizacionTab(self.automatizacion_frame)
-            print("✅ Pestaña de automatización inicializada - Sistema simplificado")
         except Exception as e:
-            print(f"⚠️ Error inicializando automatización: {e}")
-            self.tabs["automatizacion"] = None
+            self._import_results.put((None, e))
+            return
 
-    def _on_tab_changed(self, event):
-        """Maneja el cambio de pestaña."""
+        self._import_results.put((AutomatizacionTab, None))
+
+    def _poll_background_import(self):
+        """Revisa desde el hilo de Tk si terminó el import en segundo plano."""
         try:
-            selected_tab = event.widget.tab('current')['text']
+            automatizacion_cls, error = self._import_results.get_nowait()
+        except queue.Empty:
+            self.after(50, self._poll_background_import)
+            return
+
+        # Los widgets se construyen en el hilo principal (Tk no es thread-safe)
+        self._install_real_tabs(automatizacion_cls, error)
+
+    def _install_real_tabs(self, automatizacion_cls, error=None):
+        """Reemplaza el marcador de carga por la pestaña real."""
+        placeholder = self.tabs.get("automatizacion")
+        if placeholder:
+            placeholder.destroy()
+        self._register_tab("automatizacion", None)
 
-            if "Automatización" in selected_tab:
-                self.show_tab("automatizacion")
+        try:
+            if automatizacion_cls is None:
+                raise error
 
+            self._register_tab("automatizacion", automatizacion_cls(self.automatizacion_frame))
+            log.info("Pestaña de automatización inicializada")
         except Exception as e:
-            print(f"⚠️ Error en cambio de pestaña: {e}")
+            log.warning("Error inicializando automatización: %s", e)
+            self.update_status(f"Error inicializando automatización: {e}", "danger")
+            return
+
+        # Mostrar la pestaña real en lugar del marcador
+        if self.current_tab == "automatizacion":
+            self.current_tab = None
+            self.show_tab("automatizacion")
+
+        self.update_status("Sistema listo", "success")
+
+    def _register_tab(self, tab_name, tab):
+        """Registra una pestaña y resuelve una sola vez sus métodos show/hide."""
+        self.tabs[tab_name] = tab
+        if tab is None:
+            self._tab_handlers.pop(tab_name, None)
+        else:
+            self._tab_handlers[tab_name] = (getattr(tab, 'show', None), getattr(tab, 'hide', None))
+
+    def _on_tab_changed(self, event):
+        """Maneja el cambio de pestaña."""
+        tabid = self.notebook.select()
+        if not tabid or tabid == self._last_tabid:
+            return
+        self._last_tabid = tabid
+
+        tab_name = self._tabid_to_name.get(tabid)
+        if tab_name:
+            self._schedule_tab_activation(tab_name)
+
+    def _schedule_tab_activation(self, tab_name):
+        """Agenda la activación de la pestaña para el próximo ciclo ocioso (una por ciclo)."""
+        already_scheduled = self._pending_tab is not None
+        self._pending_tab = tab_name
+        if not already_scheduled:
+            self.after_idle(self._activate_pending_tab)
+
+    def _activate_pending_tab(self):
+        """
+        Activa la última pestaña seleccionada.
+        El notebook ya ocultó el frame anterior, así que solo se muestra la nueva.
+        """
+        tab_name, self._pending_tab = self._pending_tab, None
+        if tab_name is None or tab_name == self.current_tab:
+            return
+
+        handlers = self._tab_handlers.get(tab_name)
+        if handlers is None or handlers[0] is None:
+            return
+
+        handlers[0]()
+        self.current_tab = tab_name
 
     def show_tab(self, tab_name):
         """Muestra la pestaña especificada."""
-        try:
-            if tab_name not in self.tabs or self.tabs[tab_name] is None:
-                print(f"⚠️ Pestaña no disponible: {tab_name}")
-                return
-
-            if self.current_tab == tab_name:
-                return
+        handlers = self._tab_handlers.get(tab_name)
+        if handlers is None:
+            log.warning("Pestaña no disponible: %s", tab_name)
+            return
 
-            # Ocultar pestaña actual
-            if self.current_tab and self.current_tab in self.tabs and self.tabs[self.current_tab]:
-                if hasattr(self.tabs[self.current_tab], 'hide'):
-                    self.tabs[self.current_tab].hide()
+        if self.current_tab == tab_name:
+            return
 
-            # Mostrar nueva pestaña
-            if hasattr(self.tabs[tab_name], 'show'):
-                self.tabs[tab_name].show()
-                self.current_tab = tab_name
+        # Ocultar pestaña actual
+        current = self._tab_handlers.get(self.current_tab)
+        if current and current[1]:
+            current[1]()
 
-        except Exception as e:
-            print(f"⚠️ Error mostrando pestaña {tab_name}: {e}")
+        # Mostrar nueva pestaña
+        show = handlers[0]
+        if show:
+            show()
+            self.current_tab = tab_name
 
     def on_closing(self):
         """Maneja el cierre de la aplicación simplificado."""
-        try:
-            print("🔄 Cerrando ContaFlow v2.0...")
+        log.info("Cerrando ContaFlow v2.0...")
 
-            # Detener bot si está ejecutándose
-            automatizacion_tab = self.tabs.get('automatizacion')
-            if automatizacion_tab and hasattr(automatizacion_tab, 'bot_running'):
-                if automatizacion_tab.bot_running:
-                    print("⏹️ Deteniendo bot...")
-                    automatizacion_tab.stop_bot()
+        # Detener bot si está ejecutándose
+        automatizacion_tab = self.tabs.get('automatizacion')
+        if automatizacion_tab and getattr(automatizacion_tab, 'bot_running', False):
+            log.info("Deteniendo bot...")
+            try:
+                automatizacion_tab.stop_bot()
 
-                    # Esperar un momento para que se detenga correctamente
-                    time.sleep(1)
+                # Esperar a que el hilo del bot termine (máximo 1 segundo)
+                automatizacion_tab.bot_stopped_event.wait(timeout=1.0)
+            except Exception as e:
+                log.warning("Error deteniendo bot durante cierre: %s", e)
 
-            print("✅ ContaFlow v2.0 cerrado correctamente")
+        log.info("ContaFlow v2.0 cerrado correctamente")
+        try:
             self.destroy()
-
-        except Exception as e:
-            print(f"⚠️ Error durante cierre: {e}")
         finally:
             sys.exit(0)
 
@@ -245,129 +395,84 @@ class MainWindow(tk.Tk):
         Returns:
             dict: Información del sistema
         """
-        try:
-            automatizacion_tab = self.tabs.get('automatizacion')
-
-            system_info = {
-                'version': '2.0',
-                'system_name': 'ContaFlow - Sistema Simplificado',
-                'system_type': 'simplified_cargador_search',
-                'ui_framework': 'tkinter_native',
-                'monitoring_method': 'Correos "Cargador" con archivos Excel',
-                'monitoring_interval': '1 minuto (fijo)',
-                'cache_system': 'Anti-duplicados habilitado',
-                'search_robustness': 'Sin dependencia de estado UNSEEN',
-                'tabs_available': list(self.tabs.keys()),
-                'current_tab': self.current_tab,
-                'features_removed': [
-                    'Auto-inicio del bot',
-                    'Configuración de intervalo variable',
-                    'Búsqueda compleja por criterios',
-                    'UI compleja con muchas opciones'
-                ],
-                'features_simplified': [
-                    'Control básico del bot (start/stop)',
-                    'Configuración mínima requerida',
-                    'Búsqueda específica correos "Cargador"',
-                    'Intervalo fijo optimizado'
-                ]
-            }
+        automatizacion_tab = self.tabs.get('automatizacion')
+
+        system_info = dict(_STATIC_SYSTEM_INFO)
+        system_info['tabs_available'] = list(self.tabs.keys())
+        system_info['current_tab'] = self.current_tab
 
-            # Agregar información del bot si está disponible
-            if automatizacion_tab:
+        # Agregar información del bot si está disponible
+        bot_status = {}
+        if automatizacion_tab:
+            try:
                 bot_status = automatizacion_tab.get_bot_status()
-                system_info.update({
-                    'bot_available': True,
-                    'bot_running': bot_status.get('running', False),
-                    'bot_status': bot_status
-                })
-            else:
-                system_info.update({
-                    'bot_available': False,
-                    'bot_running': False,
-                    'bot_status': {}
-                })
-
-            return system_info
+            except Exception as e:
+                system_info['error'] = str(e)
 
-        except Exception as e:
-            return {
-                'version': '2.0',
-                'system_name': 'ContaFlow - Sistema Simplificado',
-                'error': str(e),
-                'tabs_available': [],
-                'current_tab': None,
-                'bot_available': False
-            }
+        system_info.update({
+            'bot_available': bool(automatizacion_tab),
+            'bot_running': bot_status.get('running', False),
+            'bot_status': bot_status
+        })
+
+        return system_info
+
+    def invalidate_config_cache(self):
+        """Invalida el estado de configuración cacheado (llamar tras guardar configuración)."""
+        self._config_version += 1
 
     def get_configuration_status(self):
         """
         Obtiene el estado de configuración del sistema.
+        El resultado se cachea hasta la próxima invalidate_config_cache().
 
         Returns:
             dict: Estado de la configuración
         """
-        try:
-            # Intentar obtener información de configuración
-            try:
-                from config_manager import ConfigManager
-                config_manager = ConfigManager()
-                config = config_manager.load_config()
-
-                if not config:
-                    return {
-                        'configured': False,
-                        'message': 'No hay configuración guardada',
-                        'required_steps': [
-                            'Configurar credenciales de email',
-                            'Configurar carpeta de descarga'
-                        ]
-                    }
-
-                # Verificar configuración básica
-                email_configured = bool(config.get('email') and config.get('password'))
-                search_configured = bool(config.get('search_criteria', {}).get('download_folder'))
-
-                status = {
-                    'configured': email_configured and search_configured,
-                    'email_configured': email_configured,
-                    'search_configured': search_configured,
-                    'xml_configured': bool(config.get('xml_config')),
-                    'recipients_configured': bool(config.get('recipients_config')),
-                    'system_version': config.get('version', '2.0'),
-                    'last_updated': config.get('last_updated', 'Desconocido')
-                }
-
-                # Generar recomendaciones
-                recommendations = []
-                if not email_configured:
-                    recommendations.append('Configurar credenciales de email en pestaña Configuración')
-                if not search_configured:
-                    recommendations.append('Configurar carpeta de descarga en pestaña Configuración > Búsqueda')
-                if not status['xml_configured']:
-                    recommendations.append('Configurar procesamiento XML para funcionalidad completa (opcional)')
-                if not status['recipients_configured']:
-                    recommendations.append('Configurar destinatarios para envío automático (opcional)')
-
-                status['recommendations'] = recommendations
-                status['ready_to_start'] = email_configured and search_configured
-
-                return status
-
-            except ImportError:
-                return {
-                    'configured': False,
-                    'error': 'ConfigManager no disponible',
-                    'message': 'Error del sistema'
-                }
+        cache = self._config_status_cache
+        if cache is not None and cache[0] == self._config_version:
+            return cache[1]
 
-        except Exception as e:
+        status = self._compute_configuration_status()
+        self._config_status_cache = (self._config_version, status)
+        return status
+
+    def _compute_configuration_status(self):
+        """Lee la configuración desde disco y calcula su estado."""
+        # ConfigManager maneja internamente los errores de lectura (devuelve None)
+        config_manager = ConfigManager()
+        config = config_manager.load_config()
+
+        if not config:
             return {
                 'configured': False,
-                'error': str(e),
-                'message': 'Error verificando configuración'
+                'message': 'No hay configuración guardada',
+                'required_steps': [
+                    'Configurar credenciales de email',
+                    'Configurar carpeta de descarga'
+                ]
             }
 
+        # Verificar configuración básica
+        email_configured = bool(config.get('email') and config.get('password'))
+        search_configured = bool(config.get('search_criteria', {}).get('download_folder'))
+
+        status = {
+            'configured': email_configured and search_configured,
+            'email_configured': email_configured,
+            'search_configured': search_configured,
+            'xml_configured': bool(config.get('xml_config')),
+            'recipients_configured': bool(config.get('recipients_config')),
+            'system_version': config.get('version', '2.0'),
+            'last_updated': config.get('last_updated', 'Desconocido')
+        }
+
+        # Generar recomendaciones
+        status['recommendations'] = [msg for key, msg in _REC_TABLE if not status[key]]
+        status['ready_to_start'] = email_configured and search_configured
+
+        return status
+
     def diagnose_system(self):
         """
         Realiza un diagnóstico completo del sistema.
@@ -386,84 +491,76 @@ class MainWindow(tk.Tk):
             'warnings': []
         }
 
-        try:
-            # Obtener información del sistema
-            diagnosis['system_info'] = self.get_system_info()
-
-            # Obtener estado de configuración
-            diagnosis['configuration_status'] = self.get_configuration_status()
-
-            # Obtener estado del bot
-            automatizacion_tab = self.tabs.get('automatizacion')
-            if automatizacion_tab:
-                diagnosis['bot_status'] = automatizacion_tab.get_bot_status()
-
-            # Evaluar salud del sistema
-            critical_issues = []
-            warnings = []
-
-            # Verificar pestañas críticas
-            if not self.tabs.get('automatizacion'):
-                critical_issues.append('Pestaña de Automatización no disponible')
-
-            # Verificar configuración
-            config_status = diagnosis['configuration_status']
-            if config_status.get('error'):
-                critical_issues.append(f"Error en configuración: {config_status['error']}")
-            elif not config_status.get('configured'):
-                if not config_status.get('email_configured'):
-                    critical_issues.append('Email no configurado')
-                if not config_status.get('search_configured'):
-                    critical_issues.append('Carpeta de descarga no configurada')
-
-            # Verificar funcionalidades opcionales
-            if not config_status.get('xml_configured'):
-                warnings.append('Procesamiento XML no configurado - funcionalidad limitada')
-            if not config_status.get('recipients_configured'):
-                warnings.append('Envío automático no configurado')
-
-            # Determinar salud general
-            if critical_issues:
-                diagnosis['system_health'] = 'critical' if len(critical_issues) > 2 else 'warning'
-            elif warnings:
-                diagnosis['system_health'] = 'healthy_with_warnings'
-            else:
-                diagnosis['system_health'] = 'healthy'
-
-            diagnosis['critical_issues'] = critical_issues
-            diagnosis['warnings'] = warnings
-
-            # Generar recomendaciones
-            recommendations = []
-            if critical_issues:
-                recommendations.extend([
-                    'Resolver problemas críticos antes de usar el sistema',
-                    'Verificar instalación de archivos del sistema'
-                ])
-
-            if config_status.get('recommendations'):
-                recommendations.extend(config_status['recommendations'])
-
-            if diagnosis['system_health'] == 'healthy':
-                recommendations.append('Sistema listo para usar - puede iniciar el bot')
-
-            diagnosis['recommendations'] = recommendations
-
-            return diagnosis
+        system_info, config_status, critical_issues, warnings = self._collect_diagnosis()
 
-        except Exception as e:
-            diagnosis.update({
-                'system_health': 'error',
-                'error': str(e),
-                'critical_issues': [f'Error en diagnóstico: {str(e)}'],
-                'recommendations': ['Reiniciar aplicación', 'Verificar integridad de archivos']
-            })
-            return diagnosis
+        diagnosis['system_info'] = system_info
+        diagnosis['configuration_status'] = config_status
+        diagnosis['bot_status'] = system_info.get('bot_status', {})
+
+        # Determinar salud general
+        if critical_issues:
+            diagnosis['system_health'] = 'critical' if len(critical_issues) > 2 else 'warning'
+        elif warnings:
+            diagnosis['system_health'] = 'healthy_with_warnings'
+        else:
+            diagnosis['system_health'] = 'healthy'
+
+        diagnosis['critical_issues'] = critical_issues
+        diagnosis['warnings'] = warnings
+
+        # Generar recomendaciones
+        recommendations = []
+        if critical_issues:
+            recommendations.extend([
+                'Resolver problemas críticos antes de usar el sistema',
+                'Verificar instalación de archivos del sistema'
+            ])
+
+        if config_status.get('recommendations'):
+            recommendations.extend(config_status['recommendations'])
+
+        if diagnosis['system_health'] == 'healthy':
+            recommendations.append('Sistema listo para usar - puede iniciar el bot')
+
+        diagnosis['recommendations'] = recommendations
+
+        return diagnosis
+
+    def _collect_diagnosis(self):
+        """
+        Reúne en una sola pasada la información del sistema, el estado de
+        configuración (una sola lectura, cacheada) y los problemas detectados.
+
+        Returns:
+            tuple: (system_info, config_status, critical_issues, warnings)
+        """
+        system_info = self.get_system_info()
+        config_status = self.get_configuration_status()
+
+        critical_issues = []
+        warnings = []
+
+        # Verificar pestañas críticas (el estado del bot ya viene en system_info)
+        if not self.tabs.get('automatizacion'):
+            critical_issues.append('Pestaña de Automatización no disponible')
+
+        # Verificar configuración
+        if config_status.get('error'):
+            critical_issues.append(f"Error en configuración: {config_status['error']}")
+        elif not config_status.get('configured'):
+            if not config_status.get('email_configured'):
+                critical_issues.append('Email no configurado')
+            if not config_status.get('search_configured'):
+                critical_issues.append('Carpeta de descarga no configurada')
+
+        # Verificar funcionalidades opcionales
+        if not config_status.get('xml_configured'):
+            warnings.append('Procesamiento XML no configurado - funcionalidad limitada')
+        if not config_status.get('recipients_configured'):
+            warnings.append('Envío automático no configurado')
+
+        return system_info, config_status, critical_issues, warnings
 
     def _get_current_timestamp(self):
         """Obtiene timestamp actual."""
-        try:
-            from datetime import datetime
-            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        except:
-            return "timestamp_error"
\ No newline at end of file
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
@@ -5,48 +5,73 @@ Maneja múltiples patrones de placas vehiculares y formatea la salida para Conta
 """
 
 import re
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from typing import Dict, Final, Iterable, Iterator, Optional, List, Tuple
+
+# Patrones de verificación precompilados (se usan por cada código procesado)
+_KM_CODE_RE: Final[re.Pattern] = re.compile(r'^[kK][mM][\s]?\d+$')
+# Puntuación que se descarta al medir el texto restante en casos "solo KM" (los espacios se
+# quitan con split/join)
+_KM_FILLER_TABLE: Final[Dict[int, None]] = str.maketrans('', '', ':-_.,;')
+
+# Prefiltro: toda placa y todo kilometraje contienen al menos un dígito (\d, igual que los
+# patrones). El escaneo lo hace el motor en C, sin iterar caracteres en Python.
+_HAS_DIGIT_RE: Final[re.Pattern] = re.compile(r'\d')
+
+# Inicio donde el patrón genérico de placa no es válido: "km " / "km-" (kilometraje). Se
+# verifica después del match (ver _search_placa) en lugar de con un lookahead dentro del patrón.
+# Se aplica sobre el texto ya en minúsculas, por eso no usa IGNORECASE.
+_GEN_EXCLUDE_RE: Final[re.Pattern] = re.compile(r'km[\s\-]')
+
+# Validación de formato (códigos ya en mayúsculas)
+_VALID_ALNUM_RE: Final[re.Pattern] = re.compile(r'^([A-Z]{2,3}[\s\-]?\d{3,4}|\d{6}|[A-Z]{3}\d{3})$')
+_VALID_M_RE: Final[re.Pattern] = re.compile(r'^[mM][\s]?\d{6}$')
+_VALID_CL_RE: Final[re.Pattern] = re.compile(r'^CL\d{6}$')
+
+# Tipos de palabra clave de placa (grupos de keyword_re) en orden de prioridad
+_KEYWORD_PRIORITY: Final[Tuple[str, ...]] = ('placa_colon', 'placa_eq', 'pl_colon')
+
+# Clasificación para estadísticas: grupo del patrón de placa -> tipo de patrón
+_PATTERN_BUCKETS: Final[Dict[str, str]] = {'m': 'M_format_7', 'cl': 'CL_special', 'gen': 'alphanumeric_6'}
 
 
 class OtroTextoProcessor:
     """Clase especializada para procesar el campo <OtroTexto> y extraer códigos de placas vehiculares."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Inicializa el procesador con los patrones de búsqueda de placas."""
-        # Patrones de placas a buscar - ORDEN CORREGIDO: M/m primero, luego 6 dígitos
-        self.placa_patterns = [
+        # Palabras clave que indican que viene una placa (placa:, placa=, pl:) en una sola regex;
+        # el grupo con nombre indica el tipo de palabra clave (ver _scan_keywords)
+        # Ejemplos: "Placa:BJX 894", "PLACA = CL435475", "pl:m833753"
+        # Las regex de búsqueda trabajan sobre el texto en minúsculas (se convierte una sola
+        # vez por texto) y no usan IGNORECASE; el código extraído se pasa a mayúsculas al limpiar.
+        self.keyword_re: Final[re.Pattern] = re.compile(
+            r'(?P<placa_colon>placa\s*:)|(?P<placa_eq>placa\s*=)|(?P<pl_colon>pl\s*:)')
+
+        # Patrón para detectar kilometraje
+        self.km_pattern: Final[re.Pattern] = re.compile(r'km[\s:]?\d+')
+
+        # Patrones de placas a buscar - ORDEN CORREGIDO: M/m primero, luego CL, luego el genérico.
+        # Trabajan sobre el texto en minúsculas, en orden de prioridad y con un grupo con nombre
+        # que identifica el tipo de placa. No se fusionan en una sola alternancia: esta
+        # devolvería el match más a la izquierda y no el de mayor prioridad
+        # (ej. "Contado:706916 ... m914559" debe dar M914559, no 706916)
+        # Se mantiene el motor estándar `re`: sin cuantificadores anidados ni lookarounds, la
+        # búsqueda es lineal en el largo del texto
+        self.placa_regexes: Final[Tuple[re.Pattern, ...]] = (
             # Patrón 1: 7 dígitos empezando con M/m (PRIMERO para evitar que se pierda la M)
             # Ejemplos: m914559, M 782308, M914559
-            r'([mM][\s]?\d{6})',
+            re.compile(r'(?P<m>m\s?\d{6})'),
 
             # Patrón 2: Formato especial CL + 6 dígitos
             # Ejemplos: CL435475
-            r'(CL\d{6})',
+            re.compile(r'(?P<cl>cl\d{6})'),
 
             # Patrón 3: 6 dígitos alfanuméricos (con espacios o guiones opcionales)
             # Ejemplos: BJX 894, 123456, BJM-653, ABC123
-            # IMPORTANTE: Excluir KM explícitamente
-            r'((?![kK][mM][\s\-])[A-Z]{2,3}[\s\-]?\d{3,4}|\d{6}|[A-Z]{3}\d{3})'
-        ]
-
-        # Palabras clave que indican que viene una placa (AGREGADO pl:)
-        self.placa_keywords = [
-            r'placa\s*:',
-            r'PLACA\s*:',
-            r'Placa\s*:',
-            r'placa\s*=',
-            r'PLACA\s*=',
-            r'Placa\s*=',
-            r'pl\s*:',  # NUEVO: para casos como "pl:m833753"
-            r'PL\s*:'  # NUEVO: versión mayúscula
-        ]
-
-        # Patrón para detectar kilometraje
-        self.km_pattern = re.compile(r'[kK][mM][\s:]?\d+', re.IGNORECASE)
-
-        # Compilar patrones para mejor rendimiento
-        self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.placa_patterns]
-        self.compiled_keywords = [re.compile(keyword, re.IGNORECASE) for keyword in self.placa_keywords]
+            # IMPORTANTE: KM se excluye explícitamente después del match (_GEN_EXCLUDE_RE)
+            re.compile(r'(?P<gen>[a-z]{2,3}[\s\-]?\d{3,4}|\d{6}|[a-z]{3}\d{3})'),
+        )
 
     def extract_placa_code(self, otro_texto: str) -> Optional[str]:
         """
@@ -58,34 +83,81 @@ class OtroTextoProcessor:
         Returns:
             str: Código de placa extraído o None si no se encuentra
         """
-        if not otro_texto or not otro_texto.strip():
+        if not isinstance(otro_texto, str) or not otro_texto.strip():
             return None
 
-        try:
-            # Limpiar el texto
-            texto_limpio = otro_texto.strip()
+        found = self._extract_placa_tagged(otro_texto)
+        return found[0] if found else None
 
-            # Buscar códigos de placa después de palabras clave
-            placa_code = self._find_placa_after_keywords(texto_limpio)
+    def _extract_placa_tagged(self, otro_texto: str) -> Optional[Tuple[str, str]]:
+        """
+        Extrae el código de placa junto con el grupo del patrón que lo encontró.
 
-            if placa_code:
-                # Verificar que no sea un código KM
-                if not self._is_km_code(placa_code):
-                    return self._clean_placa_code(placa_code)
+        Args:
+            otro_texto (str): Contenido del campo <OtroTexto> (no vacío)
 
-            # Si no encuentra después de keywords, buscar patrones en todo el texto
-            placa_code = self._find_placa_patterns(texto_limpio)
+        Returns:
+            Tuple[str, str]: (código limpio, grupo 'm' | 'cl' | 'gen') o None si no se encuentra
+        """
+        # Limpiar el texto y pasarlo a minúsculas una sola vez para todas las búsquedas
+        texto_cf = otro_texto.strip().lower()
+        return self._extract_from_lowered(texto_cf, self._scan_keywords(texto_cf))
 
-            if placa_code:
-                # Verificar que no sea un código KM
-                if not self._is_km_code(placa_code):
-                    return self._clean_placa_code(placa_code)
+    def _scan_keywords(self, texto_cf: str) -> List[int]:
+        """
+        Recorre una sola vez las palabras clave de placa (placa:, placa=, pl:) del texto.
 
-            return None
+        El resultado se comparte entre la extracción y la verificación de "solo KM". Se usa la
+        primera aparición de cada palabra clave, ordenadas por prioridad (placa: > placa= > pl:)
+        y no por su posición en el texto.
 
-        except Exception as e:
-            print(f"Error extrayendo código de placa: {e}")
-            return None
+        Args:
+            texto_cf (str): Texto limpio en minúsculas
+
+        Returns:
+            List[int]: Posición donde termina cada palabra clave, por prioridad (vacía si no hay)
+        """
+        # Todas las palabras clave empiezan con "pl": sin esa subcadena no hace falta la regex
+        if 'pl' not in texto_cf:
+            return []
+
+        first_ends = {}
+        for keyword_match in self.keyword_re.finditer(texto_cf):
+            first_ends.setdefault(keyword_match.lastgroup, keyword_match.end())
+            if len(first_ends) == len(_KEYWORD_PRIORITY):
+                break
+        return [first_ends[kind] for kind in _KEYWORD_PRIORITY if kind in first_ends]
+
+    def _extract_from_lowered(self, texto_cf: str, keyword_ends: List[int]) -> Optional[Tuple[str, str]]:
+        """
+        Extracción sobre el texto ya en minúsculas y con las palabras clave ya localizadas.
+
+        Args:
+            texto_cf (str): Texto limpio en minúsculas
+            keyword_ends (List[int]): Resultado de _scan_keywords()
+
+        Returns:
+            Tuple[str, str]: (código limpio, grupo 'm' | 'cl' | 'gen') o None si no se encuentra
+        """
+        # Buscar códigos de placa después de palabras clave
+        match = self._find_placa_after_keywords(texto_cf, keyword_ends)
+
+        if match:
+            placa_code = match.group(match.lastgroup)
+            # Verificar que no sea un código KM
+            if not self._is_km_code(placa_code):
+                return self._clean_extracted_code(placa_code), match.lastgroup
+
+        # Si no encuentra después de keywords, buscar patrones en todo el texto
+        match = self._find_placa_patterns(texto_cf)
+
+        if match:
+            placa_code = match.group(match.lastgroup)
+            # Verificar que no sea un código KM
+            if not self._is_km_code(placa_code):
+                return self._clean_extracted_code(placa_code), match.lastgroup
+
+        return None
 
     def _is_km_code(self, code: str) -> bool:
         """
@@ -101,49 +173,62 @@ class OtroTextoProcessor:
             return False
 
         # Verificar si el código coincide con patrón KM
-        return bool(re.match(r'^[kK][mM][\s]?\d+$', code.strip()))
+        return bool(_KM_CODE_RE.match(code.strip()))
 
-    def _find_placa_after_keywords(self, texto: str) -> Optional[str]:
+    def _find_placa_after_keywords(self, texto: str, keyword_ends: List[int]) -> Optional[re.Match]:
         """
         Busca códigos de placa después de palabras clave específicas.
 
         Args:
-            texto (str): Texto donde buscar
+            texto (str): Texto en minúsculas donde buscar
+            keyword_ends (List[int]): Posiciones donde termina cada palabra clave
 
         Returns:
-            str: Código encontrado o None
+            re.Match: Match del patrón de placa o None
         """
-        for keyword_pattern in self.compiled_keywords:
-            # Buscar la palabra clave
-            keyword_match = keyword_pattern.search(texto)
-
-            if keyword_match:
-                # Obtener el texto después de la palabra clave
-                start_pos = keyword_match.end()
-                texto_despues = texto[start_pos:start_pos + 50]  # Buscar en los siguientes 50 caracteres
-
-                # Buscar patrones de placa en el texto después de la palabra clave
-                for pattern in self.compiled_patterns:
-                    match = pattern.search(texto_despues)
-                    if match:
-                        return match.group(1)
+        for start_pos in keyword_ends:
+            # Buscar en los siguientes 50 caracteres después de la palabra clave (sin copiar)
+            match = self._search_placa(texto, start_pos, start_pos + 50)
+            if match:
+                return match
 
         return None
 
-    def _find_placa_patterns(self, texto: str) -> Optional[str]:
+    def _find_placa_patterns(self, texto: str) -> Optional[re.Match]:
         """
         Busca patrones de placa en todo el texto.
 
         Args:
-            texto (str): Texto donde buscar
+            texto (str): Texto en minúsculas donde buscar
 
         Returns:
-            str: Código encontrado o None
+            re.Match: Match del patrón de placa o None
+        """
+        return self._search_placa(texto, 0, len(texto))
+
+    def _search_placa(self, texto: str, pos: int, endpos: int) -> Optional[re.Match]:
         """
-        for pattern in self.compiled_patterns:
-            match = pattern.search(texto)
+        Busca los patrones de placa en orden de prioridad (M, CL, genérico) dentro del rango.
+
+        Gana el primer patrón que tenga algún match en el rango, aunque otro patrón de menor
+        prioridad coincida más a la izquierda. Un match genérico que empieza en "km " o "km-"
+        se reintenta desde la posición siguiente, igual que haría un lookahead negativo.
+
+        Args:
+            texto (str): Texto en minúsculas donde buscar
+            pos (int): Posición inicial
+            endpos (int): Posición final (exclusiva)
+
+        Returns:
+            re.Match: Match encontrado o None
+        """
+        for placa_regex in self.placa_regexes:
+            search = placa_regex.search
+            match = search(texto, pos, endpos)
+            while match and match.lastgroup == 'gen' and _GEN_EXCLUDE_RE.match(texto, match.start(), endpos):
+                match = search(texto, match.start() + 1, endpos)
             if match:
-                return match.group(1)
+                return match
         return None
 
     def _is_only_km_info(self, otro_texto: str) -> bool:
@@ -156,38 +241,62 @@ class OtroTextoProcessor:
         Returns:
             bool: True si solo contiene información de KM
         """
-        if not otro_texto or not otro_texto.strip():
+        if not isinstance(otro_texto, str) or not otro_texto.strip():
             return False
 
-        try:
-            texto_limpio = otro_texto.strip()
+        texto_cf = otro_texto.strip().lower()
 
-            # Verificar si contiene patrón KM
-            km_match = self.km_pattern.search(texto_limpio)
-            if not km_match:
-                return False
+        # Verificar que NO contenga indicadores de placa
+        if self._scan_keywords(texto_cf):
+            return False  # Si tiene keywords de placa, no es "solo KM"
 
-            # Verificar que NO contenga indicadores de placa
-            for keyword_pattern in self.compiled_keywords:
-                if keyword_pattern.search(texto_limpio):
-                    return False  # Si tiene keywords de placa, no es "solo KM"
+        # Verificar si contiene patrón KM
+        km_match = self.km_pattern.search(texto_cf)
+        if not km_match:
+            return False
 
-            # Remover TODOS los patrones KM del texto
-            texto_sin_km = self.km_pattern.sub('', texto_limpio)
+        return self._is_km_remainder_short(texto_cf, km_match)
 
-            # Limpiar espacios, puntuación básica y caracteres comunes
-            texto_sin_km = re.sub(r'[:\s\-_.,;]+', '', texto_sin_km).strip()
+    def _is_km_remainder_short(self, texto_limpio: str, km_match: re.Match) -> bool:
+        """
+        Verifica si, quitando los patrones KM, queda muy poco texto significativo.
 
-            # Si después de remover KM y limpiar queda muy poco texto significativo
-            # consideramos que es "solo KM"
-            return len(texto_sin_km) < 5
+        Args:
+            texto_limpio (str): Texto limpio en minúsculas
+            km_match (re.Match): Primer match de km_pattern en el texto (ya buscado)
 
-        except Exception:
-            return False
+        Returns:
+            bool: True si solo contiene información de KM
+        """
+        # Remover TODOS los patrones KM del texto; antes del primer match no hay ninguno,
+        # así que solo se vuelve a buscar desde su final
+        texto_sin_km = texto_limpio[:km_match.start()] + self.km_pattern.sub('', texto_limpio[km_match.end():])
+
+        # Limpiar espacios, puntuación básica y caracteres comunes (translate + split, sin regex)
+        texto_sin_km = ''.join(texto_sin_km.translate(_KM_FILLER_TABLE).split())
+
+        # Si después de remover KM y limpiar queda muy poco texto significativo
+        # consideramos que es "solo KM"
+        return len(texto_sin_km) < 5
+
+    def _clean_extracted_code(self, placa_code: str) -> str:
+        """
+        Normaliza un código devuelto por los patrones de placa (placa_regexes).
+
+        El match ya solo contiene letras, dígitos y a lo sumo un separador interno
+        (espacio o guion), así que basta con unificar el espacio y pasar a mayúsculas.
+
+        Args:
+            placa_code (str): Código extraído por placa_regexes
+
+        Returns:
+            str: Código normalizado (igual que _clean_placa_code para estos códigos)
+        """
+        return ' '.join(placa_code.split()).upper()
 
     def _clean_placa_code(self, placa_code: str) -> str:
         """
-        Limpia y normaliza el código de placa extraído.
+        Limpia y normaliza un código de placa de origen arbitrario (sanitizador completo).
 
         Args:
             placa_code (str): Código bruto extraído
@@ -201,13 +310,12 @@ class OtroTextoProcessor:
         # Limpiar espacios extra y caracteres especiales
         cleaned = placa_code.strip()
 
-        # Normalizar espacios múltiples a uno solo
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-
-        # Remover caracteres no alfanuméricos excepto espacios y guiones
-        cleaned = re.sub(r'[^\w\s\-]', '', cleaned)
+        # Normalizar espacios múltiples a uno solo (split/join en C, sin regex)
+        cleaned = ' '.join(cleaned.split())
 
-        return cleaned.upper()  # Convertir a mayúsculas para consistencia
+        # Remover caracteres no alfanuméricos excepto espacios y guiones, y convertir a
+        # mayúsculas para consistencia (una sola pasada, sin regex)
+        return ''.join(ch for ch in cleaned.upper() if ch.isalnum() or ch in ' _-')
 
     def format_combustible_output(self, placa_code: str) -> str:
         """
@@ -234,31 +342,82 @@ class OtroTextoProcessor:
         Returns:
             str: Texto formateado listo para usar o None si no se encuentra placa
         """
+        # Entrada validada una sola vez; prefiltro: toda placa y todo kilometraje contienen dígitos
+        if not isinstance(otro_texto, str) or not _HAS_DIGIT_RE.search(otro_texto):
+            return None
+
+        # Los mismos OtroTexto se repiten entre facturas: resultado memoizado por texto
+        return _process_tagged_cached(otro_texto)[0]
+
+    def _process_tagged(self, otro_texto: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Procesa un texto ya validado (str con dígitos).
+
+        Args:
+            otro_texto (str): Contenido del campo <OtroTexto>
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (resultado, tipo_de_patrón), donde el tipo es una
+            clave de 'patterns_found' ('M_format_7', 'CL_special', 'alphanumeric_6', 'km_only') o None
+        """
+        # Minúsculas y palabras clave se calculan una vez para extracción y verificación KM
+        texto_cf = otro_texto.strip().lower()
+        keyword_ends = self._scan_keywords(texto_cf)
+
         # Primero intentar extraer código de placa normal
-        placa_code = self.extract_placa_code(otro_texto)
+        found = self._extract_from_lowered(texto_cf, keyword_ends)
 
-        if placa_code:
-            return self.format_combustible_output(placa_code)
+        if found:
+            return self.format_combustible_output(found[0]), _PATTERN_BUCKETS[found[1]]
 
-        # Si no encontró placa, verificar si es caso especial de "solo KM"
-        if self._is_only_km_info(otro_texto):
-            return "Combustible / Placa: ?"
+        # Si no encontró placa, verificar si es caso especial de "solo KM": sin palabras clave
+        # de placa y con un patrón KM; si falta cualquiera de los dos no hace falta más trabajo
+        if not keyword_ends:
+            km_match = self.km_pattern.search(texto_cf)
+            if km_match and self._is_km_remainder_short(texto_cf, km_match):
+                return "Combustible / Placa: ?", 'km_only'
 
         # Si no es placa ni caso especial KM, retornar None para usar Detalle
-        return None
+        return None, None
 
-    def get_extraction_stats(self, otro_texto_list: List[str]) -> dict:
+    def process_many(self, otro_textos: Iterable[str]) -> List[Optional[str]]:
         """
-        Obtiene estadísticas de extracción para una lista de textos OtroTexto.
+        Procesa un lote de textos OtroTexto en una sola pasada.
 
         Args:
-            otro_texto_list (List[str]): Lista de textos a analizar
+            otro_textos (Iterable[str]): Contenidos de campos <OtroTexto>
+
+        Returns:
+            List[Optional[str]]: Resultado de process_otro_texto() para cada texto, en orden
+        """
+        return [result for result, _ in self._iter_process(otro_textos)]
+
+    def _iter_process(self, otro_textos: Iterable[str]) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        """Versión en línea de process_otro_texto(); genera (resultado, tipo_de_patrón) por texto."""
+        has_digit = _HAS_DIGIT_RE.search
+        process = _process_tagged_cached
+
+        for otro_texto in otro_textos:
+            if not isinstance(otro_texto, str) or not has_digit(otro_texto):
+                yield None, None
+            else:
+                yield process(otro_texto)
+
+    def get_extraction_stats(self, otro_texto_iter: Iterable[str]) -> dict:
+        """
+        Obtiene estadísticas de extracción para textos OtroTexto.
+
+        Los textos se consumen uno a uno, por lo que se puede pasar un generador
+        (por ejemplo, leyendo XML en streaming) sin construir la lista completa.
+
+        Args:
+            otro_texto_iter (Iterable[str]): Textos a analizar
 
         Returns:
             dict: Estadísticas de extracción
         """
         stats = {
-            'total_processed': len(otro_texto_list),
+            'total_processed': 0,
             'placas_found': 0,
             'km_only_cases': 0,
             'placas_not_found': 0,
@@ -272,29 +431,22 @@ class OtroTextoProcessor:
             }
         }
 
-        for texto in otro_texto_list:
-            result = self.process_otro_texto(texto)
+        total = 0
 
+        # El tipo de patrón viene del grupo que encontró la placa (sin regex adicionales)
+        for result, pattern_type in self._iter_process(otro_texto_iter):
+            total += 1
             if result:
-                if result == "Combustible / Placa: ?":
+                if pattern_type == 'km_only':
                     stats['km_only_cases'] += 1
-                    stats['patterns_found']['km_only'] += 1
                 else:
                     stats['placas_found'] += 1
-                    placa_code = result.replace("Combustible / Placa: ", "")
-
-                    # Clasificar el tipo de patrón encontrado
-                    if re.match(r'[mM][\s]?\d{6}', placa_code, re.IGNORECASE):
-                        stats['patterns_found']['M_format_7'] += 1
-                    elif re.match(r'CL\d{6}', placa_code, re.IGNORECASE):
-                        stats['patterns_found']['CL_special'] += 1
-                    elif re.match(r'([A-Z]{2,3}[\s\-]?\d{3,4}|\d{6}|[A-Z]{3}\d{3})', placa_code, re.IGNORECASE):
-                        stats['patterns_found']['alphanumeric_6'] += 1
-                    else:
-                        stats['patterns_found']['other'] += 1
+                stats['patterns_found'][pattern_type] += 1
             else:
                 stats['placas_not_found'] += 1
 
+        stats['total_processed'] = total
+
         # Calcular tasa de extracción (incluyendo casos KM)
         successful_extractions = stats['placas_found'] + stats['km_only_cases']
         if stats['total_processed'] > 0:
@@ -312,38 +464,35 @@ class OtroTextoProcessor:
         Returns:
             Tuple[bool, str]: (es_válido, descripción_del_formato)
         """
-        try:
-            if not placa_code or not placa_code.strip():
-                return False, "Código vacío"
+        if not isinstance(placa_code, str) or not placa_code.strip():
+            return False, "Código vacío"
 
-            cleaned_code = placa_code.strip().upper()
+        cleaned_code = placa_code.strip().upper()
 
-            # Caso especial para KM
-            if cleaned_code == "?":
-                return True, "Caso especial KM"
+        # Caso especial para KM
+        if cleaned_code == "?":
+            return True, "Caso especial KM"
 
-            # Verificar que no sea código KM
-            if self._is_km_code(cleaned_code):
-                return False, "Es código de kilometraje, no placa"
+        # Verificar que no sea código KM
+        if self._is_km_code(cleaned_code):
+            return False, "Es código de kilometraje, no placa"
 
-            # Validar patrón 1: 6 dígitos alfanuméricos
-            if re.match(r'^([A-Z]{2,3}[\s\-]?\d{3,4}|\d{6}|[A-Z]{3}\d{3})$', cleaned_code):
-                return True, "6 dígitos alfanuméricos"
+        # Validar patrón 1: 6 dígitos alfanuméricos
+        if _VALID_ALNUM_RE.match(cleaned_code):
+            return True, "6 dígitos alfanuméricos"
 
-            # Validar patrón 2: 7 dígitos con M
-            if re.match(r'^[mM][\s]?\d{6}$', cleaned_code):
-                return True, "7 dígitos formato M"
+        # Validar patrón 2: 7 dígitos con M
+        if _VALID_M_RE.match(cleaned_code):
+            return True, "7 dígitos formato M"
 
-            # Validar patrón 3: Formato CL especial
-            if re.match(r'^CL\d{6}$', cleaned_code):
-                return True, "Formato especial CL"
+        # Validar patrón 3: Formato CL especial
+        if _VALID_CL_RE.match(cleaned_code):
+            return True, "Formato especial CL"
 
-            return False, "Formato no reconocido"
-        except Exception:
-            return False, "Error validando formato"
+        return False, "Formato no reconocido"
 
 
-def create_otro_texto_processor():
+def create_otro_texto_processor() -> OtroTextoProcessor:
     """
     Factory function para crear una instancia del procesador de OtroTexto.
 
@@ -353,6 +502,21 @@ def create_otro_texto_processor():
     return OtroTextoProcessor()
 
 
+@lru_cache(maxsize=1)
+def _get_default_processor() -> OtroTextoProcessor:
+    """Instancia compartida (el procesador no tiene estado) para las funciones de utilidad."""
+    return OtroTextoProcessor()
+
+
+@lru_cache(maxsize=4096)
+def _process_tagged_cached(otro_texto: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resultado memoizado por texto, compartido por todas las instancias (los patrones son
+    fijos, así que el resultado solo depende del texto). Tamaño acotado para no crecer sin límite.
+    """
+    return _get_default_processor()._process_tagged(otro_texto)
+
+
 # Funciones de utilidad para uso directo
 def extract_placa_from_otro_texto(otro_texto: str) -> Optional[str]:
     """
@@ -364,8 +528,7 @@ def extract_placa_from_otro_texto(otro_texto: str) -> Optional[str]:
     Returns:
         str: Texto formateado "Combustible / Placa: [CÓDIGO]" o None
     """
-    processor = create_otro_texto_processor()
-    return processor.process_otro_texto(otro_texto)
+    return _get_default_processor().process_otro_texto(otro_texto)
 
 
 def validate_placa_code(placa_code: str) -> bool:
@@ -378,8 +541,7 @@ def validate_placa_code(placa_code: str) -> bool:
     Returns:
         bool: True si el formato es válido
     """
-    processor = create_otro_texto_processor()
-    is_valid, _ = processor.validate_placa_format(placa_code)
+    is_valid, _ = _get_default_processor().validate_placa_format(placa_code)
     return is_valid
 
 
@@ -401,6 +563,14 @@ if __name__ == "__main__":
 
         """KM: 8765""",  # Caso especial: solo kilometraje
 
+        """Factura Contado:706916 Posicion:7 m914559""",  # Debería extraer m914559 (M antes que 6 dígitos)
+
+        """Factura 706916 m914559""",  # Debería extraer m914559, no "URA 7069"
+
+        """pl: 123456 placa: m654321""",  # Debería extraer m654321 (placa: antes que pl:)
+
+        """placa= 111111 placa: 222222""",  # Debería extraer 222222 (placa: antes que placa=)
+
         """Ejemplo sin placa válida o sin campo placa"""
     ]
 
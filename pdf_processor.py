@@ -4,16 +4,60 @@ Procesador de PDFs mejorado para ContaFlow con soporte robusto para facturas de
 Extrae números de factura y códigos de guías con múltiples patrones y manejo avanzado de errores.
 """
 
+import importlib.util
+import logging
 import os
 import re
-from typing import List, Optional, Tuple, Dict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 
-try:
-    import pdfplumber
+# pdfplumber es una importación pesada (pdfminer, PIL...): aquí solo se verifica que esté
+# instalado y se importa recién al extraer el primer PDF (_iter_page_texts)
+PDFPLUMBER_AVAILABLE = importlib.util.find_spec('pdfplumber') is not None
 
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
+# pypdfium2 (PDFium en C++) es opcional: si está instalado se usa primero para extraer el
+# texto y pdfplumber queda como respaldo (fallo o texto vacío)
+PYPDFIUM2_AVAILABLE = importlib.util.find_spec('pypdfium2') is not None
+
+log = logging.getLogger("contaflow.pdf_processor")
+
+# Patrones auxiliares precompilados (se usan en cada PDF procesado)
+_WS_RE = re.compile(r'\s+')
+_SEARCH_TRANS = str.maketrans({'º': '°'})  # Normalizar símbolos de grado (incluye "Nº" -> "N°")
+_LINE_NUM_RE = re.compile(r'\b(\d{4,8})\b')
+_FACTURA_LINE_RE = re.compile(r'^[^\n]*factura[^\n]*', re.IGNORECASE | re.MULTILINE)
+_FACTURA_CONTEXT_RE = re.compile(r'(?:factura|invoice|doc|documento).{0,50}?(\d{4,8})', re.IGNORECASE | re.DOTALL)
+_CHAR_TEXT = itemgetter('text')
+
+# Todo patrón de factura contiene al menos uno de estos fragmentos (en minúsculas); si el texto
+# no tiene ninguno, la alternancia de patrones no puede encontrar nada
+_FACTURA_MARKERS = ('factura', '°', '#', 'no.', 'núm.')
+
+# Máximo de PDFs cuyo texto extraído se conserva por procesador
+_PDF_TEXT_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=128)
+def _list_pdf_files(directory: str, dir_mtime_ns: int) -> Tuple[str, ...]:
+    """
+    Lista los PDFs de una carpeta (en el orden del directorio) una sola vez por lote.
+
+    La mtime de la carpeta forma parte de la clave: si se agregan o eliminan archivos
+    la caché deja de coincidir y se vuelve a listar.
+
+    Args:
+        directory (str): Carpeta a listar
+        dir_mtime_ns (int): os.stat(directory).st_mtime_ns
+
+    Returns:
+        Tuple[str, ...]: Nombres de archivos .pdf (sin distinguir mayúsculas en la extensión;
+        se omiten carpetas con esa extensión)
+    """
+    # scandir trae el tipo de cada entrada junto con el nombre: is_file() no hace otro stat
+    with os.scandir(directory) as entries:
+        return tuple(entry.name for entry in entries
+                     if entry.name.lower().endswith('.pdf') and entry.is_file())
 
 
 class CorreosPDFProcessor:
@@ -39,9 +83,37 @@ class CorreosPDFProcessor:
             r'(?:N°|No\.|Núm\.|#)\s*(\d{4,8})',  # Patrón genérico flexible
         ]
 
+        # Los patrones de factura fusionados en una sola alternancia (una sola pasada por el texto).
+        # La alternancia va dentro de un lookahead para que un match no consuma texto: así un
+        # patrón de menor prioridad que empieza antes ("Documento N° 1234") no oculta a uno de
+        # mayor prioridad que empieza dentro de él ("N° 1234").
+        # El lookahead inicial [nfd#] (todos los patrones empiezan con N°/No./Núm., Factura,
+        # Documento o #) permite al motor saltar rápido entre posiciones candidatas; si se agrega
+        # un patrón que empiece con otro carácter hay que incluirlo ahí.
+        # Se mantiene el motor estándar `re`: Hyperscan no soporta grupos de captura (el número
+        # habría que re-extraerlo con `re` igual) y trabaja con offsets en bytes UTF-8, no en str.
+        # Cada patrón va envuelto en un grupo; factura_union_groups mapea el índice de ese grupo
+        # a (número de patrón, índice del grupo que captura el número).
+        self.factura_regexes = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in self.factura_patterns]
+        self.factura_union_groups = {}
+        union_parts = []
+        group_index = 1
+        for i, (pattern, regex) in enumerate(zip(self.factura_patterns, self.factura_regexes), 1):
+            union_parts.append(f'({pattern})')
+            self.factura_union_groups[group_index] = (i, group_index + 1)
+            group_index += 1 + regex.groups
+        self.factura_union = re.compile(f"(?=[nfd#])(?=(?:{'|'.join(union_parts)}))",
+                                        re.IGNORECASE | re.MULTILINE)
+
         # Patrones para códigos de guías (mantenidos del original)
         self.guias_pattern = r'Guías?\s*\n(.*?)(?:\n\n|\Z)'
+        # Formato: 2 letras + 9 dígitos + 2 letras opcionales (ej. NE084204615CR, NE123456789)
         self.guia_code_pattern = r'([A-Z]{2}\d{9}[A-Z]{0,2})'
+        self.guia_code_re = re.compile(self.guia_code_pattern)
+
+        # Texto extraído por PDF: (ruta, mtime) -> (texto, páginas procesadas, páginas fallidas).
+        # Varios XML pueden terminar asociados al mismo PDF; así no se vuelve a parsear.
+        self._pdf_text_cache = {}
 
         # Configuración de debugging
         self.debug_mode = True
@@ -67,7 +139,7 @@ class CorreosPDFProcessor:
             xml_dir = os.path.dirname(xml_file_path)
             xml_name = os.path.splitext(os.path.basename(xml_file_path))[0]
 
-            self._debug_log(f"Buscando PDF para XML: {xml_name}")
+            self._debug_log("Buscando PDF para XML: %s", xml_name)
 
             # Patrones de búsqueda de PDF más exhaustivos
             search_patterns = [
@@ -77,36 +149,43 @@ class CorreosPDFProcessor:
                 f"{xml_name.upper()}.pdf",
             ]
 
-            # Buscar con nombres exactos
+            # Listado de PDFs de la carpeta, compartido por todos los XML del mismo lote
+            list_dir = xml_dir or os.curdir
+            pdf_files = _list_pdf_files(list_dir, os.stat(list_dir).st_mtime_ns)
+
+            # Buscar con nombres exactos (y sin distinguir mayúsculas, como en Windows)
+            pdf_names = set(pdf_files)
+            pdf_names_lower = {}
+            for file in pdf_files:
+                pdf_names_lower.setdefault(file.lower(), file)
+
             for pattern in search_patterns:
-                pdf_path = os.path.join(xml_dir, pattern)
-                if os.path.exists(pdf_path):
-                    self._debug_log(f"PDF encontrado con patrón exacto: {pattern}")
-                    return pdf_path
+                file = pattern if pattern in pdf_names else pdf_names_lower.get(pattern.lower())
+                if file:
+                    self._debug_log("PDF encontrado con patrón exacto: %s", pattern)
+                    return os.path.join(xml_dir, file)
 
             # Buscar cualquier PDF que contenga parte del nombre del XML
             xml_base = xml_name.split('-')[0] if '-' in xml_name else xml_name[:10]
+            xml_base_lower = xml_base.lower()
 
-            for file in os.listdir(xml_dir):
-                if file.lower().endswith('.pdf'):
-                    # Verificar si contiene parte del nombre base
-                    if xml_base.lower() in file.lower():
-                        pdf_path = os.path.join(xml_dir, file)
-                        self._debug_log(f"PDF encontrado por coincidencia parcial: {file}")
-                        return pdf_path
-
-            # Como último recurso, buscar cualquier PDF en la carpeta
-            for file in os.listdir(xml_dir):
-                if file.lower().endswith('.pdf'):
+            for file in pdf_files:
+                # Verificar si contiene parte del nombre base
+                if xml_base_lower in file.lower():
                     pdf_path = os.path.join(xml_dir, file)
-                    self._debug_log(f"PDF encontrado (cualquier PDF): {file}")
+                    self._debug_log("PDF encontrado por coincidencia parcial: %s", file)
                     return pdf_path
 
+            # Como último recurso, tomar cualquier PDF en la carpeta
+            if pdf_files:
+                self._debug_log("PDF encontrado (cualquier PDF): %s", pdf_files[0])
+                return os.path.join(xml_dir, pdf_files[0])
+
             self._debug_log("No se encontró ningún PDF asociado")
             return None
 
         except Exception as e:
-            self._debug_log(f"Error buscando PDF asociado: {e}")
+            self._debug_log("Error buscando PDF asociado: %s", e)
             return None
 
     def extract_factura_number(self, pdf_text: str) -> Optional[str]:
@@ -125,39 +204,82 @@ class CorreosPDFProcessor:
             # Limpiar el texto para mejorar la búsqueda
             cleaned_text = self._clean_text_for_search(pdf_text)
 
-            # Probar cada patrón hasta encontrar un match
+            # Una sola pasada con todos los patrones: primer número encontrado por cada patrón.
+            # Si el texto no tiene ningún marcador (PDFs que no son facturas) se omite la pasada
+            # y se sigue directo a la búsqueda de respaldo
+            lowered_text = cleaned_text.lower()
+            if any(marker in lowered_text for marker in _FACTURA_MARKERS):
+                first_matches = self._find_first_factura_matches(cleaned_text)
+            else:
+                self._debug_log("Sin marcadores de factura en el texto, se omiten los patrones")
+                first_matches = {}
+
+            # Probar cada patrón en orden de prioridad hasta encontrar un match
             for i, pattern in enumerate(self.factura_patterns, 1):
                 self.extraction_stats['patterns_tried'] += 1
 
-                matches = re.findall(pattern, cleaned_text, re.IGNORECASE | re.MULTILINE)
-
-                if matches:
-                    # Tomar el primer match válido
-                    factura_number = matches[0]
+                if i in first_matches:
+                    # Tomar el primer match del patrón
+                    factura_number = first_matches[i]
 
                     # Validar que el número tenga sentido
                     if self._validate_factura_number(factura_number):
                         self.extraction_stats['successful_pattern'] = f"Patrón {i}: {pattern}"
-                        self._debug_log(f"✅ Número de factura encontrado con patrón {i}: {factura_number}")
-                        self._debug_log(f"Patrón exitoso: {pattern}")
+                        self._debug_log("✅ Número de factura encontrado con patrón %s: %s", i, factura_number)
+                        self._debug_log("Patrón exitoso: %s", pattern)
                         return factura_number
                     else:
-                        self._debug_log(f"⚠️ Número inválido encontrado con patrón {i}: {factura_number}")
+                        self._debug_log("⚠️ Número inválido encontrado con patrón %s: %s", i, factura_number)
 
             # Si no encontramos nada con patrones específicos, buscar números que parezcan facturas
             fallback_number = self._fallback_factura_search(cleaned_text)
             if fallback_number:
                 self.extraction_stats['successful_pattern'] = "Búsqueda de respaldo"
-                self._debug_log(f"✅ Número de factura encontrado con búsqueda de respaldo: {fallback_number}")
+                self._debug_log("✅ Número de factura encontrado con búsqueda de respaldo: %s", fallback_number)
                 return fallback_number
 
             self._debug_log("❌ No se pudo extraer número de factura con ningún patrón")
             return None
 
         except Exception as e:
-            self._debug_log(f"❌ Error extrayendo número de factura: {e}")
+            self._debug_log("❌ Error extrayendo número de factura: %s", e)
             return None
 
+    def _find_first_factura_matches(self, cleaned_text: str) -> Dict[int, str]:
+        """
+        Recorre el texto una sola vez con la alternancia de patrones de factura.
+
+        Args:
+            cleaned_text (str): Texto limpio donde buscar
+
+        Returns:
+            Dict[int, str]: Número de patrón (1..N) -> primer número capturado por ese patrón
+        """
+        first_matches = {}
+        total_patterns = len(self.factura_regexes)
+
+        for match in self.factura_union.finditer(cleaned_text):
+            pattern_num, number_group = self.factura_union_groups[match.lastindex]
+            if pattern_num not in first_matches:
+                first_matches[pattern_num] = match.group(number_group)
+
+            # La alternancia solo reporta el primer patrón que coincide en esta posición;
+            # los de menor prioridad aún no vistos se prueban anclados aquí
+            position = match.start()
+            for other_num in range(pattern_num + 1, total_patterns + 1):
+                if other_num not in first_matches:
+                    other_match = self.factura_regexes[other_num - 1].match(cleaned_text, position)
+                    if other_match:
+                        first_matches[other_num] = other_match.group(1)
+
+            # Con todos los patrones vistos, o con el patrón 1 (máxima prioridad) válido,
+            # no hace falta seguir recorriendo el texto
+            if len(first_matches) == total_patterns or (
+                    1 in first_matches and self._validate_factura_number(first_matches[1])):
+                break
+
+        return first_matches
+
     def _clean_text_for_search(self, text: str) -> str:
         """
         Limpia y normaliza el texto para mejorar la búsqueda de patrones.
@@ -168,18 +290,12 @@ class CorreosPDFProcessor:
         Returns:
             str: Texto limpio y normalizado
         """
-        try:
-            # Reemplazar caracteres problemáticos
-            cleaned = text.replace('\u00a0', ' ')  # Espacios no separables
-            cleaned = re.sub(r'\s+', ' ', cleaned)  # Múltiples espacios a uno solo
-            cleaned = cleaned.replace('º', '°')  # Normalizar símbolos de grado
-            cleaned = cleaned.replace('Nº', 'N°')  # Normalizar N°
-            cleaned = cleaned.replace('n°', 'N°')  # Normalizar minúsculas
-
-            return cleaned.strip()
-        except Exception as e:
-            self._debug_log(f"Error limpiando texto: {e}")
-            return text
+        # Reemplazar caracteres problemáticos
+        cleaned = text.translate(_SEARCH_TRANS)  # º -> ° en una sola pasada
+        cleaned = _WS_RE.sub(' ', cleaned)  # Múltiples espacios (incluye no separables) a uno solo
+        cleaned = cleaned.replace('n°', 'N°')  # Normalizar minúsculas
+
+        return cleaned.strip()
 
     def _validate_factura_number(self, number: str) -> bool:
         """
@@ -191,27 +307,17 @@ class CorreosPDFProcessor:
         Returns:
             bool: True si el número es válido
         """
-        try:
-            # Convertir a entero para validar
-            num_int = int(number)
-
-            # Validar longitud (entre 4 y 8 dígitos es razonable)
-            if len(number) < 4 or len(number) > 8:
-                return False
-
-            # Validar que no sea cero o muy pequeño
-            if num_int < 1000:
-                return False
-
-            # Validar que no sea excesivamente grande
-            if num_int > 99999999:
-                return False
-
-            return True
-
-        except ValueError:
+        # Validar longitud (entre 4 y 8 dígitos es razonable) y que sean solo dígitos;
+        # con 8 dígitos como máximo nunca es excesivamente grande
+        if not 4 <= len(number) <= 8 or not number.isdecimal():
             return False
 
+        # Validar que no sea cero o muy pequeño (>= 1000): sin ceros a la izquierda
+        # deben quedar al menos 4 dígitos. Sin convertir a entero salvo dígitos no ASCII.
+        if number.isascii():
+            return len(number.lstrip('0')) >= 4
+        return int(number) >= 1000
+
     def _fallback_factura_search(self, text: str) -> Optional[str]:
         """
         Búsqueda de respaldo para números que podrían ser facturas.
@@ -222,35 +328,24 @@ class CorreosPDFProcessor:
         Returns:
             str: Número de factura encontrado o None
         """
-        try:
-            # Buscar líneas que contengan "factura" y números
-            lines = text.split('\n')
-
-            for line in lines:
-                if 'factura' in line.lower():
-                    # Buscar números de 4-8 dígitos en esta línea
-                    numbers = re.findall(r'\b(\d{4,8})\b', line)
-
-                    for number in numbers:
-                        if self._validate_factura_number(number):
-                            self._debug_log(
-                                f"Número encontrado en búsqueda de respaldo: {number} (línea: {line.strip()[:50]})")
-                            return number
-
-            # Si no encontramos nada específico, buscar números de longitud apropiada cerca de texto relevante
-            factura_context_pattern = r'(?:factura|invoice|doc|documento).{0,50}?(\d{4,8})'
-            matches = re.findall(factura_context_pattern, text, re.IGNORECASE | re.DOTALL)
-
-            for match in matches:
-                if self._validate_factura_number(match):
-                    self._debug_log(f"Número encontrado por contexto: {match}")
-                    return match
-
-            return None
+        # Buscar líneas que contengan "factura" (una sola pasada, sin partir el texto en líneas)
+        for line_match in _FACTURA_LINE_RE.finditer(text):
+            # Buscar números de 4-8 dígitos en esta línea (sobre el texto original, sin copiar)
+            for number_match in _LINE_NUM_RE.finditer(text, line_match.start(), line_match.end()):
+                number = number_match.group(1)
+                if self._validate_factura_number(number):
+                    self._debug_log("Número encontrado en búsqueda de respaldo: %s (línea: %s)",
+                                    number, line_match.group().strip()[:50])
+                    return number
+
+        # Si no encontramos nada específico, buscar números de longitud apropiada cerca de texto relevante
+        for context_match in _FACTURA_CONTEXT_RE.finditer(text):
+            number = context_match.group(1)
+            if self._validate_factura_number(number):
+                self._debug_log("Número encontrado por contexto: %s", number)
+                return number
 
-        except Exception as e:
-            self._debug_log(f"Error en búsqueda de respaldo: {e}")
-            return None
+        return None
 
     def extract_guias_codes(self, pdf_text: str) -> List[str]:
         """
@@ -262,135 +357,178 @@ class CorreosPDFProcessor:
         Returns:
             List[str]: Lista de códigos de guías encontrados
         """
-        try:
-            self._debug_log("Iniciando extracción de códigos de guías")
-            guias_codes = []
-
-            # Buscar todas las ocurrencias del patrón de código de guía en todo el texto
-            matches = re.findall(self.guia_code_pattern, pdf_text)
-
-            for match in matches:
-                # Validar que el código tenga el formato esperado
-                if self._validate_guia_code(match):
-                    guias_codes.append(match)
-
-            # Eliminar duplicados manteniendo el orden
-            seen = set()
-            unique_guias = []
-            for guia in guias_codes:
-                if guia not in seen:
-                    seen.add(guia)
-                    unique_guias.append(guia)
-
-            self._debug_log(f"Códigos de guías encontrados: {len(unique_guias)} únicos de {len(matches)} totales")
-            for i, code in enumerate(unique_guias, 1):
-                self._debug_log(f"  {i}. {code}")
+        self._debug_log("Iniciando extracción de códigos de guías")
 
-            return unique_guias
+        # Recorrer las ocurrencias del patrón de código de guía (cada match ya tiene el
+        # formato esperado), eliminando duplicados en orden. Sin límite: todas las guías de
+        # la factura van al Excel de salida
+        matches = self.guia_code_re.findall(pdf_text)
+        total_matches = len(matches)
+        unique_guias = list(dict.fromkeys(matches))
 
-        except Exception as e:
-            self._debug_log(f"Error extrayendo códigos de guías: {e}")
-            return []
+        if self._debug_enabled():
+            self._debug_log("Códigos de guías encontrados: %s únicos de %s totales", len(unique_guias), total_matches)
+            for i, code in enumerate(unique_guias, 1):
+                self._debug_log("  %s. %s", i, code)
 
-    def _validate_guia_code(self, code: str) -> bool:
+        return unique_guias
+
+    def extract_pdf_text(self, pdf_path: str) -> Optional[str]:
         """
-        Valida que un código de guía tenga el formato esperado con validación mejorada.
+        Extrae todo el texto de un archivo PDF con manejo robusto de errores.
 
         Args:
-            code (str): Código a validar
+            pdf_path (str): Ruta del archivo PDF
 
         Returns:
-            bool: True si el código es válido
+            str: Texto extraído del PDF o None si hay error
         """
         try:
-            # Formato esperado: 2 letras + 9 dígitos + 2 letras opcionales
-            # Ejemplos: NE084204615CR, NE116467408CR, NE123456789
-            pattern = r'^[A-Z]{2}\d{9}[A-Z]{0,2}$'
-            is_valid = bool(re.match(pattern, code))
+            if not os.path.exists(pdf_path):
+                self._debug_log("❌ PDF no encontrado: %s", pdf_path)
+                return None
 
-            if not is_valid:
-                self._debug_log(f"Código de guía inválido: {code}")
+            # Reutilizar el texto si el mismo PDF (sin modificar) ya se procesó
+            cache_key = (pdf_path, os.stat(pdf_path).st_mtime_ns)
+            cached = self._pdf_text_cache.get(cache_key)
+            if cached is not None:
+                text, self.extraction_stats['pages_processed'], self.extraction_stats['pages_failed'] = cached
+                self._debug_log("♻️ Texto de PDF reutilizado: %s", os.path.basename(pdf_path))
+                return text
 
-            return is_valid
+            self._debug_log("📄 Iniciando extracción de texto de PDF: %s", os.path.basename(pdf_path))
+            self.extraction_stats['pages_processed'] = 0
+            self.extraction_stats['pages_failed'] = 0
 
-        except Exception:
-            return False
+            full_text = ""
+            if PYPDFIUM2_AVAILABLE:
+                try:
+                    full_text = "\n".join(self._iter_pdfium_page_texts(pdf_path))
+                except Exception as e:
+                    self._debug_log("⚠️ pypdfium2 falló, usando pdfplumber: %s", e)
+                    full_text = ""
 
-    def extract_pdf_text(self, pdf_path: str) -> Optional[str]:
+            if not full_text.strip():
+                self.extraction_stats['pages_processed'] = 0
+                self.extraction_stats['pages_failed'] = 0
+
+                # Las páginas se consumen una a una y el texto se une una sola vez al final
+                # (join con separador: sin copiar cada página para agregarle el salto de línea)
+                full_text = "\n".join(self._iter_page_texts(pdf_path))
+
+            # Estadísticas finales (solo se calculan si se van a mostrar)
+            if self._debug_enabled():
+                success_rate = ((self.extraction_stats['pages_processed'] - self.extraction_stats['pages_failed']) /
+                                self.extraction_stats['pages_processed'] * 100) if self.extraction_stats[
+                                                                                       'pages_processed'] > 0 else 0
+
+                self._debug_log("📊 Extracción completada:")
+                self._debug_log("  - Páginas procesadas: %s", self.extraction_stats['pages_processed'])
+                self._debug_log("  - Páginas fallidas: %s", self.extraction_stats['pages_failed'])
+                self._debug_log("  - Tasa de éxito: %.1f%%", success_rate)
+                self._debug_log("  - Texto total extraído: %s caracteres", len(full_text))
+
+            text = full_text.strip() or None
+            if not text:
+                self._debug_log("❌ No se pudo extraer texto del PDF")
+
+            if len(self._pdf_text_cache) >= _PDF_TEXT_CACHE_SIZE:
+                # Descartar la entrada más antigua (los dict conservan el orden de inserción)
+                del self._pdf_text_cache[next(iter(self._pdf_text_cache))]
+            self._pdf_text_cache[cache_key] = (text, self.extraction_stats['pages_processed'],
+                                               self.extraction_stats['pages_failed'])
+
+            return text
+
+        except Exception as e:
+            self._debug_log("❌ Error crítico abriendo PDF %s: %s", pdf_path, e)
+            return None
+
+    def _iter_pdfium_page_texts(self, pdf_path: str) -> Iterator[str]:
         """
-        Extrae todo el texto de un archivo PDF con manejo robusto de errores.
+        Genera el texto de cada página usando pypdfium2 (vía rápida, sin análisis de layout en Python).
+
+        Las páginas sin texto se contabilizan como fallidas en extraction_stats y no se generan.
+        Los errores de apertura se propagan para que extract_pdf_text() recurra a pdfplumber.
 
         Args:
             pdf_path (str): Ruta del archivo PDF
 
-        Returns:
-            str: Texto extraído del PDF o None si hay error
+        Yields:
+            str: Texto extraído de cada página (con saltos de línea '\\n')
         """
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(pdf_path)
         try:
-            if not os.path.exists(pdf_path):
-                self._debug_log(f"❌ PDF no encontrado: {pdf_path}")
-                return None
+            total_pages = len(pdf)
+            self._debug_log("Total de páginas en PDF (pypdfium2): %s", total_pages)
+
+            for page_num in range(1, total_pages + 1):
+                self.extraction_stats['pages_processed'] += 1
+                page = pdf[page_num - 1]
+                textpage = page.get_textpage()
+                try:
+                    # PDFium separa las líneas con "\r\n"; los patrones trabajan con "\n"
+                    page_text = textpage.get_text_bounded().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+                    page.close()
+
+                if page_text.strip():
+                    self._debug_log("✅ Página %s: %s caracteres extraídos", page_num, len(page_text))
+                    yield page_text
+                else:
+                    self._debug_log("⚠️ Página %s: Sin texto extraído", page_num)
+                    self.extraction_stats['pages_failed'] += 1
+        finally:
+            pdf.close()
+
+    def _iter_page_texts(self, pdf_path: str) -> Iterator[str]:
+        """
+        Genera el texto de cada página del PDF, una a la vez, dentro del contexto abierto.
 
-            self._debug_log(f"📄 Iniciando extracción de texto de PDF: {os.path.basename(pdf_path)}")
-            full_text = ""
-            self.extraction_stats['pages_processed'] = 0
-            self.extraction_stats['pages_failed'] = 0
+        Las páginas sin texto o con error se contabilizan en extraction_stats y no se generan.
 
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
-                self._debug_log(f"Total de páginas en PDF: {total_pages}")
+        Args:
+            pdf_path (str): Ruta del archivo PDF
 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        self.extraction_stats['pages_processed'] += 1
-                        page_text = page.extract_text()
+        Yields:
+            str: Texto extraído de cada página
+        """
+        import pdfplumber
 
-                        if page_text:
-                            full_text += page_text + "\n"
-                            self._debug_log(f"✅ Página {page_num}: {len(page_text)} caracteres extraídos")
-                        else:
-                            self._debug_log(f"⚠️ Página {page_num}: Sin texto extraído")
-                            self.extraction_stats['pages_failed'] += 1
+        with pdfplumber.open(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+            self._debug_log("Total de páginas en PDF: %s", total_pages)
 
-                    except Exception as e:
-                        self.extraction_stats['pages_failed'] += 1
-                        self._debug_log(f"❌ Error extrayendo texto de página {page_num}: {e}")
-
-                        # Intentar métodos alternativos para esta página
-                        try:
-                            # Método alternativo: extraer texto caracter por caracter
-                            chars = page.chars
-                            if chars:
-                                alt_text = ''.join([char.get('text', '') for char in chars])
-                                if alt_text.strip():
-                                    full_text += alt_text + "\n"
-                                    self._debug_log(f"✅ Página {page_num}: Extraído con método alternativo")
-                                    continue
-                        except Exception as alt_e:
-                            self._debug_log(f"❌ Método alternativo también falló para página {page_num}: {alt_e}")
-
-                        continue
-
-            # Estadísticas finales
-            success_rate = ((self.extraction_stats['pages_processed'] - self.extraction_stats['pages_failed']) /
-                            self.extraction_stats['pages_processed'] * 100) if self.extraction_stats[
-                                                                                   'pages_processed'] > 0 else 0
-
-            self._debug_log(f"📊 Extracción completada:")
-            self._debug_log(f"  - Páginas procesadas: {self.extraction_stats['pages_processed']}")
-            self._debug_log(f"  - Páginas fallidas: {self.extraction_stats['pages_failed']}")
-            self._debug_log(f"  - Tasa de éxito: {success_rate:.1f}%")
-            self._debug_log(f"  - Texto total extraído: {len(full_text)} caracteres")
+            for page_num, page in enumerate(pdf.pages, 1):
+                try:
+                    self.extraction_stats['pages_processed'] += 1
+                    page_text = page.extract_text()
 
-            if not full_text.strip():
-                self._debug_log("❌ No se pudo extraer texto del PDF")
-                return None
+                    if page_text:
+                        self._debug_log("✅ Página %s: %s caracteres extraídos", page_num, len(page_text))
+                        yield page_text
+                    else:
+                        self._debug_log("⚠️ Página %s: Sin texto extraído", page_num)
+                        self.extraction_stats['pages_failed'] += 1
 
-            return full_text.strip()
+                except Exception as e:
+                    self.extraction_stats['pages_failed'] += 1
+                    self._debug_log("❌ Error extrayendo texto de página %s: %s", page_num, e)
 
-        except Exception as e:
-            self._debug_log(f"❌ Error crítico abriendo PDF {pdf_path}: {e}")
-            return None
+                    # Intentar métodos alternativos para esta página
+                    try:
+                        # Método alternativo: extraer texto caracter por caracter
+                        chars = page.chars
+                        if chars:
+                            alt_text = ''.join(map(_CHAR_TEXT, chars))
+                            if alt_text.strip():
+                                self._debug_log("✅ Página %s: Extraído con método alternativo", page_num)
+                                yield alt_text
+                    except Exception as alt_e:
+                        self._debug_log("❌ Método alternativo también falló para página %s: %s", page_num, alt_e)
 
     def process_correos_pdf(self, xml_file_path: str) -> Tuple[bool, Optional[str]]:
         """
@@ -404,7 +542,7 @@ class CorreosPDFProcessor:
                              "(345520) SERVICIO EMS (ENVIO DE PAQUETES)/GUIA NE084204615CR"
         """
         try:
-            self._debug_log(f"🚀 Iniciando procesamiento de PDF de Correos para XML: {os.path.basename(xml_file_path)}")
+            self._debug_log("🚀 Iniciando procesamiento de PDF de Correos para XML: %s", os.path.basename(xml_file_path))
 
             # Resetear estadísticas
             self.extraction_stats = {
@@ -420,7 +558,7 @@ class CorreosPDFProcessor:
                 self._debug_log("❌ No se encontró PDF asociado")
                 return False, None
 
-            self._debug_log(f"📎 PDF asociado encontrado: {os.path.basename(pdf_path)}")
+            self._debug_log("📎 PDF asociado encontrado: %s", os.path.basename(pdf_path))
 
             # Extraer texto del PDF
             pdf_text = self.extract_pdf_text(pdf_path)
@@ -429,8 +567,9 @@ class CorreosPDFProcessor:
                 return False, None
 
             # Mostrar muestra del texto extraído para debugging
-            self._debug_log(f"📝 Muestra del texto extraído (primeros 200 caracteres):")
-            self._debug_log(f"  {pdf_text[:200]}...")
+            if self._debug_enabled():
+                self._debug_log("📝 Muestra del texto extraído (primeros 200 caracteres):")
+                self._debug_log("  %s...", pdf_text[:200])
 
             # Extraer número de factura
             factura_number = self.extract_factura_number(pdf_text)
@@ -449,27 +588,35 @@ class CorreosPDFProcessor:
             formatted_data = f"({factura_number}) SERVICIO EMS (ENVIO DE PAQUETES)/GUIA {guias_text}"
 
             # Log de éxito con estadísticas
-            self._debug_log("🎯 PROCESAMIENTO EXITOSO:")
-            self._debug_log(f"  - Número de factura: {factura_number}")
-            self._debug_log(f"  - Códigos de guías: {len(guias_codes)} encontrados")
-            self._debug_log(f"  - Patrón exitoso: {self.extraction_stats['successful_pattern']}")
-            self._debug_log(f"  - Resultado final: {formatted_data}")
+            if self._debug_enabled():
+                self._debug_log("🎯 PROCESAMIENTO EXITOSO:")
+                self._debug_log("  - Número de factura: %s", factura_number)
+                self._debug_log("  - Códigos de guías: %s encontrados", len(guias_codes))
+                self._debug_log("  - Patrón exitoso: %s", self.extraction_stats['successful_pattern'])
+                self._debug_log("  - Resultado final: %s", formatted_data)
 
             return True, formatted_data
 
         except Exception as e:
-            self._debug_log(f"❌ Error crítico procesando PDF de Correos: {e}")
+            self._debug_log("❌ Error crítico procesando PDF de Correos: %s", e)
             return False, None
 
-    def _debug_log(self, message: str):
+    def _debug_enabled(self) -> bool:
+        """Indica si los mensajes de debug se van a emitir (modo debug y nivel DEBUG activo)."""
+        return self.debug_mode and log.isEnabledFor(logging.DEBUG)
+
+    def _debug_log(self, message: str, *args):
         """
         Método de logging para debugging con control de verbosidad.
 
+        El mensaje se formatea con %-args solo si realmente se emite.
+
         Args:
-            message (str): Mensaje a loggear
+            message (str): Mensaje a loggear (formato %)
+            *args: Valores para el mensaje
         """
-        if self.debug_mode:
-            print(f"[PDF_PROCESSOR] {message}")
+        if self._debug_enabled():
+            log.debug(message, *args)
 
     def set_debug_mode(self, enabled: bool):
         """
@@ -592,6 +739,9 @@ def create_correos_pdf_processor() -> Optional[CorreosPDFProcessor]:
 
 
 if __name__ == "__main__":
+    # Al ejecutar el módulo directamente se muestran los mensajes de debug
+    logging.basicConfig(level=logging.DEBUG, format="[PDF_PROCESSOR] %(message)s")
+
     # Prueba básica del procesador mejorado
     processor = create_correos_pdf_processor()
 